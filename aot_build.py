@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time build of the PnL kernels.
+
+Compiles the kernels in market_making_simulator/_kernels.py into the
+``market_making_simulator._mm_kernels`` extension module, so the package
+can skip JIT compilation entirely:
+
+    python aot_build.py
+"""
+
+import os
+from numba.pycc import CC
+from market_making_simulator import _kernels
+
+
+def main():
+    """Compile the AOT kernel extension next to the package sources."""
+    cc = CC('_mm_kernels')
+    cc.output_dir = os.path.dirname(os.path.abspath(_kernels.__file__))
+    cc.verbose = True
+
+    for name, signature, func in _kernels.AOT_EXPORTS:
+        cc.export(name, signature)(func)
+
+    cc.compile()
+    print(f"Built _mm_kernels in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
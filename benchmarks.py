@@ -4,13 +4,24 @@ Benchmark scenarios for market-making simulator.
 
 Tests different parameter configurations to understand strategy performance
 under various market conditions.
+
+Numba kernels are JIT compiled on first use (and cached on disk), so the first
+run includes compile time. Set MMSIM_DISABLE_NUMBA=1 to time the pure-NumPy
+kernels instead, or run aot_build.py to precompile them.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict
-import pandas as pd
+import argparse
+import functools
+import hashlib
+import itertools
+import multiprocessing as mp
+import os
+import shelve
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
 from market_making_simulator import (
-    OrderBook, MarketMaker, PnLTracker, MarketSimulator
+    OrderBook, MarketMaker, PnLTracker, MarketSimulator, History
 )
 
 
@@ -25,32 +36,143 @@ class ScenarioConfig:
     num_steps: int = 100
 
 
-class BenchmarkRunner:
-    """Runs benchmark scenarios and compares results."""
+class ParameterGrid:
+    """
+    Cartesian product of scenario parameters.
     
-    def __init__(self):
-        """Initialize the benchmark runner."""
-        self.results: List[Dict] = []
+    Scenarios are generated lazily, so large sweeps never materialize the
+    full list of configurations. Parameters not given in the grid take
+    their value from `base`.
     
-    def run_scenario(self, config: ScenarioConfig, seed: int = 42) -> Dict:
+    Example:
+        ParameterGrid(quote_spread=[0.02, 0.05], volatility=[0.005, 0.02]).configs()
+    """
+    
+    BASE = {
+        'quote_spread': 0.05,
+        'inventory_skew_factor': 0.01,
+        'volatility': 0.02,
+        'arrival_rate': 0.5,
+        'num_steps': 100,
+    }
+    
+    def __init__(self, base: Optional[Dict] = None, **param_values: Sequence):
         """
-        Run a single benchmark scenario.
+        Initialize the grid.
         
         Args:
-            config: Scenario configuration
-            seed: Random seed for reproducibility
-            
-        Returns:
-            Dictionary with scenario results
+            base: Values for parameters that are not swept (defaults to BASE)
+            **param_values: Candidate values for each swept ScenarioConfig field
+        """
+        self.base = {**self.BASE, **(base or {})}
+        self.param_values = param_values
+    
+    def __len__(self) -> int:
+        size = 1
+        for values in self.param_values.values():
+            size *= len(values)
+        return size
+    
+    def configs(self) -> Iterator[ScenarioConfig]:
+        """Yield one ScenarioConfig per grid cell."""
+        names = list(self.param_values)
+        for values in itertools.product(*self.param_values.values()):
+            params = dict(zip(names, values))
+            name = ", ".join(f"{k}={v}" for k, v in params.items())
+            yield ScenarioConfig(name=name, **{**self.base, **params})
+
+
+def _cache_key(config: ScenarioConfig, seed: int) -> str:
+    """Stable key for a scenario's results (the display name is ignored)."""
+    params = asdict(config)
+    params.pop('name')
+    return hashlib.sha1(repr((sorted(params.items()), seed)).encode()).hexdigest()
+
+
+class HistoryCache:
+    """
+    On-disk cache of simulation histories keyed by (config, seed).
+    
+    Each entry is one NumPy ``.npz`` file holding the History columns and the
+    PnLTracker's trade and snapshot columns, so a cached scenario can be
+    reloaded and re-analysed without simulating it again.
+    """
+    
+    def __init__(self, path: str):
         """
-        print(f"\n{'='*60}")
-        print(f"Running: {config.name}")
-        print(f"{'='*60}")
-        print(f"  Quote Spread:        {config.quote_spread}")
-        print(f"  Inventory Skew:      {config.inventory_skew_factor}")
-        print(f"  Volatility:          {config.volatility*100:.1f}%")
-        print(f"  Arrival Rate:        {config.arrival_rate*100:.0f}%")
+        Initialize the cache.
         
+        Args:
+            path: Directory holding the cached histories (created if missing)
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+    
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + '.npz')
+    
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._file(key))
+    
+    def get(self, key: str) -> Optional[Tuple[History, PnLTracker]]:
+        """Load the (history, pnl_tracker) stored under `key`, or None."""
+        if key not in self:
+            return None
+        with np.load(self._file(key)) as data:
+            columns = {k: data[k] for k in data.files}
+        
+        def group(prefix):
+            return {k[len(prefix):]: v for k, v in columns.items() if k.startswith(prefix)}
+        
+        history = History.from_arrays(group('history_'))
+        trades = group('trade_')
+        snapshots = group('snapshot_')
+        pnl_tracker = PnLTracker()
+        pnl_tracker.record_trade_batch(trades['timestamp'], trades['side'], trades['price'],
+                                       trades['quantity'], trades['mid_price'])
+        pnl_tracker.record_inventory_snapshot_batch(snapshots['timestamp'],
+                                                    snapshots['inventory'],
+                                                    snapshots['mid_price'])
+        return history, pnl_tracker
+    
+    def put(self, key: str, history: History, pnl_tracker: PnLTracker):
+        """Store a finished simulation's history and PnL tracker under `key`."""
+        columns = {}
+        for prefix, arrays in (('history_', history.arrays()),
+                               ('trade_', pnl_tracker.get_trade_arrays()),
+                               ('snapshot_', pnl_tracker.get_snapshot_arrays())):
+            columns.update({prefix + name: column for name, column in arrays.items()})
+        # Write then rename, so concurrent workers never see a partial file
+        tmp = self._file(f'{key}.{os.getpid()}.tmp')
+        np.savez(tmp, **columns)
+        os.replace(tmp, self._file(key))
+
+
+def _run_one(
+    config_seed: Tuple[ScenarioConfig, int],
+    history_cache: Optional[str] = None
+) -> Dict:
+    """
+    Simulate a single scenario and collect its results.
+
+    Top-level (picklable) so it can be dispatched to worker processes.
+
+    Args:
+        config_seed: Tuple of (scenario configuration, random seed)
+        history_cache: Optional HistoryCache directory; cached histories are
+            reloaded instead of simulated, new ones are stored
+
+    Returns:
+        Dictionary with scenario results
+    """
+    config, seed = config_seed
+    cache = HistoryCache(history_cache) if history_cache else None
+    key = _cache_key(config, seed)
+    cached = cache.get(key) if cache else None
+    
+    if cached is not None:
+        history, pnl_tracker = cached
+    else:
         # Setup
         order_book = OrderBook(initial_mid=100.0, spread=0.10, 
                               depth_per_level=100.0, num_levels=5)
@@ -65,72 +187,204 @@ class BenchmarkRunner:
                                    random_seed=seed)
         
         # Run
-        simulator.run(
+        history = simulator.run(
             num_steps=config.num_steps,
             volatility=config.volatility,
             arrival_rate=config.arrival_rate,
             dt=1.0,
             verbose=False
         )
+        if cache:
+            cache.put(key, history, pnl_tracker)
+    
+    # Collect results
+    decomp = pnl_tracker.get_pnl_decomposition()
+    num_buys, num_sells = pnl_tracker.get_trade_count()
+    final_price = float(history.mid_price[-1])
+    
+    return {
+        'scenario': config.name,
+        'quote_spread': config.quote_spread,
+        'inventory_skew': config.inventory_skew_factor,
+        'volatility': config.volatility,
+        'arrival_rate': config.arrival_rate,
+        'total_trades': num_buys + num_sells,
+        'num_buys': num_buys,
+        'num_sells': num_sells,
+        'final_inventory': float(history.inventory[-1]),
+        'spread_capture': decomp['spread_capture'],
+        'inventory_pnl': decomp['inventory_pnl'],
+        'adverse_selection': decomp['adverse_selection'],
+        'total_pnl': decomp['total_pnl'],
+        'final_price': final_price,
+        'price_change_pct': 100 * (final_price - 100.0) / 100.0,
+    }
+
+
+def _format_table(rows: List[Dict], columns: List[str]) -> str:
+    """Format rows as a right-aligned text table."""
+    cells = [
+        [f"{row[col]:.4f}" if isinstance(row[col], float) else str(row[col]) for col in columns]
+        for row in rows
+    ]
+    widths = [max(len(col), *(len(r[i]) for r in cells)) for i, col in enumerate(columns)]
+    lines = ["  ".join(col.rjust(w) for col, w in zip(columns, widths))]
+    lines += ["  ".join(cell.rjust(w) for cell, w in zip(r, widths)) for r in cells]
+    return "\n".join(lines)
+
+
+def _print_result(config: ScenarioConfig, result: Dict):
+    """Print the configuration and results of one scenario."""
+    print(f"\n{'='*60}")
+    print(f"Running: {config.name}")
+    print(f"{'='*60}")
+    print(f"  Quote Spread:        {config.quote_spread}")
+    print(f"  Inventory Skew:      {config.inventory_skew_factor}")
+    print(f"  Volatility:          {config.volatility*100:.1f}%")
+    print(f"  Arrival Rate:        {config.arrival_rate*100:.0f}%")
+    
+    print(f"\n  Results:")
+    print(f"    Total PnL:           ${result['total_pnl']:>10.2f}")
+    print(f"    Spread Capture:      ${result['spread_capture']:>10.2f}")
+    print(f"    Inventory Risk:      ${result['inventory_pnl']:>10.2f}")
+    print(f"    Adverse Selection:   ${result['adverse_selection']:>10.2f}")
+    print(f"    Total Trades:        {result['total_trades']:>10.0f}")
+    print(f"    Final Inventory:     {result['final_inventory']:>10.0f}")
+    print(f"    Price Change:        {result['price_change_pct']:>10.2f}%")
+
+
+def _pool_context() -> mp.context.BaseContext:
+    """
+    Get the multiprocessing context for scenario workers.
+    
+    Where available, workers are forked from a server process that has
+    already imported the simulator (and NumPy/Numba), so the import cost is
+    paid once rather than by every worker.
+    """
+    if 'forkserver' not in mp.get_all_start_methods():
+        return mp.get_context()
+    ctx = mp.get_context('forkserver')
+    ctx.set_forkserver_preload(['market_making_simulator'])
+    return ctx
+
+
+def _map_scenarios(
+    configs: List[ScenarioConfig],
+    seed: int,
+    processes: Optional[int],
+    history_cache: Optional[str] = None
+) -> Iterator[Dict]:
+    """Yield results for `configs` in order, using a process pool when useful."""
+    run_one = functools.partial(_run_one, history_cache=history_cache)
+    processes = min(processes or os.cpu_count() or 1, len(configs))
+    if processes <= 1:
+        yield from map(run_one, ((c, seed) for c in configs))
+        return
+    with _pool_context().Pool(processes=processes) as pool:
+        yield from pool.imap(run_one, [(c, seed) for c in configs])
+
+
+class BenchmarkRunner:
+    """Runs benchmark scenarios and compares results."""
+    
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        history_cache: Optional[str] = None
+    ):
+        """
+        Initialize the benchmark runner.
+        
+        Args:
+            cache_path: Optional shelve file caching results by (config, seed),
+                so reruns only simulate scenarios not seen before
+            history_cache: Optional directory caching full simulation
+                histories by (config, seed) (see HistoryCache)
+        """
+        self.results: List[Dict] = []
+        self.cache_path = cache_path
+        self.history_cache = history_cache
+    
+    def run_scenario(self, config: ScenarioConfig, seed: int = 42) -> Dict:
+        """
+        Run a single benchmark scenario.
         
-        # Collect results
-        decomp = pnl_tracker.get_pnl_decomposition()
-        num_buys, num_sells = pnl_tracker.get_trade_count()
-        
-        result = {
-            'scenario': config.name,
-            'quote_spread': config.quote_spread,
-            'inventory_skew': config.inventory_skew_factor,
-            'volatility': config.volatility,
-            'arrival_rate': config.arrival_rate,
-            'total_trades': len(pnl_tracker.trades),
-            'num_buys': num_buys,
-            'num_sells': num_sells,
-            'final_inventory': simulator.market_maker.inventory,
-            'spread_capture': decomp['spread_capture'],
-            'inventory_pnl': decomp['inventory_pnl'],
-            'adverse_selection': decomp['adverse_selection'],
-            'total_pnl': decomp['total_pnl'],
-            'final_price': simulator.order_book.mid_price,
-            'price_change_pct': 100 * (simulator.order_book.mid_price - 100.0) / 100.0,
-        }
-        
-        # Print results
-        print(f"\n  Results:")
-        print(f"    Total PnL:           ${result['total_pnl']:>10.2f}")
-        print(f"    Spread Capture:      ${result['spread_capture']:>10.2f}")
-        print(f"    Inventory Risk:      ${result['inventory_pnl']:>10.2f}")
-        print(f"    Adverse Selection:   ${result['adverse_selection']:>10.2f}")
-        print(f"    Total Trades:        {result['total_trades']:>10.0f}")
-        print(f"    Final Inventory:     {result['final_inventory']:>10.0f}")
-        print(f"    Price Change:        {result['price_change_pct']:>10.2f}%")
+        Args:
+            config: Scenario configuration
+            seed: Random seed for reproducibility
+            
+        Returns:
+            Dictionary with scenario results
+        """
+        result = _run_one((config, seed), self.history_cache)
+        _print_result(config, result)
         
         self.results.append(result)
         return result
     
-    def run_all(self, scenarios: List[ScenarioConfig]):
+    def run_all(
+        self,
+        scenarios: Iterable[ScenarioConfig],
+        seed: int = 42,
+        processes: Optional[int] = None
+    ):
         """
         Run all benchmark scenarios.
         
+        Scenarios are independent, so they are dispatched across worker
+        processes; results are printed and stored in scenario order.
+        Scenarios already in the result cache are not simulated again, and
+        scenarios differing only in name are simulated once.
+        
         Args:
-            scenarios: List of scenario configurations
+            scenarios: Scenario configurations (e.g. ParameterGrid.configs())
+            seed: Random seed passed to every scenario
+            processes: Number of worker processes (defaults to CPU count,
+                1 runs everything in the current process)
         """
         print("\n" + "="*70)
         print("MARKET-MAKING SIMULATOR BENCHMARKS")
         print("="*70)
         
-        for scenario in scenarios:
-            self.run_scenario(scenario)
+        scenarios = list(scenarios)
+        cache = shelve.open(self.cache_path) if self.cache_path else {}
+        try:
+            keys = [_cache_key(c, seed) for c in scenarios]
+            # One run per key: renamed copies of a scenario share its result
+            misses = {}
+            for scenario, key in zip(scenarios, keys):
+                if key not in cache:
+                    misses.setdefault(key, scenario)
+            fresh = _map_scenarios(list(misses.values()), seed, processes, self.history_cache)
+            
+            for scenario, key in zip(scenarios, keys):
+                # Fresh results arrive in first-seen key order, as consumed here
+                if key not in cache:
+                    cache[key] = next(fresh)
+                result = {**cache[key], 'scenario': scenario.name}
+                _print_result(scenario, result)
+                self.results.append(result)
+        finally:
+            if self.cache_path:
+                cache.close()
         
         self.print_summary()
     
-    def print_summary(self):
-        """Print comparison table of all results."""
+    def print_summary(self, return_df: bool = False):
+        """
+        Print comparison table of all results.
+        
+        Args:
+            return_df: Also build and return the results as a pandas DataFrame
+            
+        Returns:
+            DataFrame of results if return_df is True, otherwise None
+        """
         if not self.results:
             print("No results to display")
             return
         
-        df = pd.DataFrame(self.results)
+        results = self.results
         
         print("\n" + "="*70)
         print("BENCHMARK SUMMARY")
@@ -143,32 +397,65 @@ class BenchmarkRunner:
         ]
         
         print("\nKey Metrics:")
-        print(df[summary_cols].to_string(index=False))
+        print(_format_table(results, summary_cols))
+        
+        # Pull each metric into an array once, then index the extremes
+        n = len(results)
+        pnls = np.fromiter((r['total_pnl'] for r in results), np.float64, n)
+        spreads = np.fromiter((r['spread_capture'] for r in results), np.float64, n)
+        adverse = np.fromiter((r['adverse_selection'] for r in results), np.float64, n)
+        i_best, i_worst = int(pnls.argmax()), int(pnls.argmin())
+        i_spread, i_adverse = int(spreads.argmax()), int(adverse.argmin())
         
         # Best performers
         print("\n" + "-"*70)
         print("BEST PERFORMERS:")
-        print(f"  Highest PnL:         {df.loc[df['total_pnl'].idxmax(), 'scenario']} "
-              f"(${df['total_pnl'].max():.2f})")
-        print(f"  Best Spread Capture: {df.loc[df['spread_capture'].idxmax(), 'scenario']} "
-              f"(${df['spread_capture'].max():.2f})")
-        print(f"  Lowest Adverse Sel.: {df.loc[df['adverse_selection'].idxmin(), 'scenario']} "
-              f"(${df['adverse_selection'].min():.2f})")
-        print(f"  Most Profitable:     {df.loc[df['total_pnl'].idxmax(), 'scenario']}")
-        
-        # Statistics
+        print(f"  Highest PnL:         {results[i_best]['scenario']} "
+              f"(${pnls[i_best]:.2f})")
+        print(f"  Best Spread Capture: {results[i_spread]['scenario']} "
+              f"(${spreads[i_spread]:.2f})")
+        print(f"  Lowest Adverse Sel.: {results[i_adverse]['scenario']} "
+              f"(${adverse[i_adverse]:.2f})")
+        print(f"  Most Profitable:     {results[i_best]['scenario']}")
+        
+        # Statistics (sample std dev, matching pandas)
+        std_pnl = pnls.std(ddof=1) if n > 1 else float('nan')
+        
         print("\n" + "-"*70)
         print("STATISTICS:")
-        print(f"  Average PnL:         ${df['total_pnl'].mean():.2f}")
-        print(f"  Std Dev PnL:         ${df['total_pnl'].std():.2f}")
-        print(f"  Worst Case:          ${df['total_pnl'].min():.2f}")
-        print(f"  Best Case:           ${df['total_pnl'].max():.2f}")
+        print(f"  Average PnL:         ${pnls.mean():.2f}")
+        print(f"  Std Dev PnL:         ${std_pnl:.2f}")
+        print(f"  Worst Case:          ${pnls[i_worst]:.2f}")
+        print(f"  Best Case:           ${pnls[i_best]:.2f}")
         
-        return df
+        if return_df:
+            import pandas as pd
+            return pd.DataFrame(results)
 
 
 def main():
     """Run benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--grid', action='store_true',
+                        help='sweep the full spread x skew x volatility x arrival grid')
+    parser.add_argument('--cache', metavar='PATH',
+                        help='cache results on disk and skip completed scenarios')
+    parser.add_argument('--history-cache', metavar='DIR',
+                        help='cache full simulation histories as .npz files in DIR')
+    parser.add_argument('--processes', type=int, help='number of worker processes')
+    args = parser.parse_args()
+    
+    runner = BenchmarkRunner(cache_path=args.cache, history_cache=args.history_cache)
+    
+    if args.grid:
+        grid = ParameterGrid(
+            quote_spread=[0.02, 0.05, 0.10],
+            inventory_skew_factor=[0.00, 0.01, 0.05],
+            volatility=[0.005, 0.02, 0.05],
+            arrival_rate=[0.2, 0.5, 0.8],
+        )
+        runner.run_all(grid.configs(), processes=args.processes)
+        return
     
     # Define benchmark scenarios
     scenarios = [
@@ -247,8 +534,7 @@ def main():
     ]
     
     # Run benchmarks
-    runner = BenchmarkRunner()
-    runner.run_all(scenarios)
+    runner.run_all(scenarios, processes=args.processes)
 
 
 if __name__ == "__main__":
@@ -6,10 +6,22 @@ and market-making strategies with detailed PnL decomposition.
 """
 
 from .engine.order_book import OrderBook
+from .engine.history import History
 from .engine.simulator import MarketSimulator
+from .engine.batch import MarketSimulatorBatch
 from .strategy.market_maker import MarketMaker
 from .analytics.pnl_tracker import PnLTracker
-from .analytics.plotter import SimulationPlotter
 
 __version__ = "0.1.0"
-__all__ = ["OrderBook", "MarketMaker", "PnLTracker", "MarketSimulator", "SimulationPlotter"]
+__all__ = [
+    "OrderBook", "MarketMaker", "PnLTracker", "MarketSimulator", "MarketSimulatorBatch",
+    "History", "SimulationPlotter"
+]
+
+
+def __getattr__(name):
+    # Loaded on first access so importing the package doesn't pull in matplotlib
+    if name == "SimulationPlotter":
+        from .analytics.plotter import SimulationPlotter
+        return SimulationPlotter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,74 @@
+"""
+Columnar storage shared by the engine and analytics layers.
+
+Holds the integer trade-side codes and a growable struct-of-arrays buffer.
+"""
+
+from typing import Dict, Optional
+import numpy as np
+
+# Integer side codes (the market maker's side of a trade)
+NO_TRADE = -1
+BUY = 0
+SELL = 1
+
+_INITIAL_CAPACITY = 256
+
+
+class ColumnBuffer:
+    """
+    Growable struct-of-arrays buffer.
+
+    Each column is a contiguous NumPy array; capacity doubles on overflow so
+    appends are amortized O(1) and reductions can run on array slices.
+    """
+
+    def __init__(self, dtypes: Dict[str, type], capacity: int = _INITIAL_CAPACITY):
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows that fit without reallocating."""
+        return len(next(iter(self.columns.values())))
+
+    def append(self, *values):
+        """Append one row (values in column order)."""
+        if self.size == self.capacity:
+            self._grow()
+        for column, value in zip(self.columns.values(), values):
+            column[self.size] = value
+        self.size += 1
+
+    def extend(self, *arrays):
+        """Append many rows at once (one array per column, in column order)."""
+        count = len(arrays[0])
+        self.reserve(count)
+        for column, values in zip(self.columns.values(), arrays):
+            column[self.size:self.size + count] = values
+        self.size += count
+
+    def reserve(self, count: int):
+        """Make room for `count` more rows with at most one reallocation."""
+        if self.size + count > self.capacity:
+            self._grow(max(self.size + count, 2 * self.capacity))
+
+    def _grow(self, capacity: Optional[int] = None):
+        """Reallocate every column (doubling the capacity by default)."""
+        capacity = capacity or max(1, 2 * self.capacity)
+        for name, column in self.columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def view(self, name: str) -> np.ndarray:
+        """Get the filled part of a column (no copy)."""
+        return self.columns[name][:self.size]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Get the filled part of every column (no copies)."""
+        return {name: column[:self.size] for name, column in self.columns.items()}
+
+    def clear(self):
+        """Drop all rows but keep the allocated capacity."""
+        self.size = 0
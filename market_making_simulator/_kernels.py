@@ -0,0 +1,100 @@
+"""
+Compiled numeric kernels for PnL decomposition.
+
+Kernels are taken from the ahead-of-time compiled ``_mm_kernels`` extension
+when it has been built (see ``aot_build.py``), otherwise they are JIT
+compiled by Numba on first use and cached on disk, so the compile cost is
+paid once rather than in every process. Without Numba, or with the
+``MMSIM_DISABLE_NUMBA`` environment variable set to a non-empty value,
+vectorized NumPy equivalents are used instead, so no compilation happens.
+"""
+
+import os
+import numpy as np
+from ._columns import BUY, SELL
+
+DISABLE_NUMBA = bool(os.environ.get('MMSIM_DISABLE_NUMBA'))
+
+njit = None
+prange = range
+if not DISABLE_NUMBA:
+    try:
+        from numba import njit, prange
+    except ImportError:
+        pass
+
+
+def _inventory_pnl(inventory: np.ndarray, mid_price: np.ndarray) -> float:
+    """Sum of previous inventory times mid price change between snapshots."""
+    pnl = 0.0
+    for i in range(1, inventory.size):
+        pnl += inventory[i - 1] * (mid_price[i] - mid_price[i - 1])
+    return pnl
+
+
+def _inventory_pnl_numpy(inventory: np.ndarray, mid_price: np.ndarray) -> float:
+    """Vectorized NumPy equivalent of _inventory_pnl."""
+    return float(np.dot(inventory[:-1], np.diff(mid_price)))
+
+
+def _adverse_selection(side: np.ndarray, mid_price: np.ndarray, quantity: np.ndarray) -> float:
+    """Cost of mid price moving against each trade before the next one."""
+    cost = 0.0
+    for i in range(side.size - 1):
+        price_move = mid_price[i + 1] - mid_price[i]
+        # Buys lose when the price falls, sells lose when it rises
+        adverse = (side[i] == BUY and price_move < 0) or (side[i] == SELL and price_move > 0)
+        cost += abs(price_move) * quantity[i] * adverse
+    return -cost
+
+
+def _adverse_selection_numpy(side: np.ndarray, mid_price: np.ndarray, quantity: np.ndarray) -> float:
+    """Vectorized NumPy equivalent of _adverse_selection."""
+    if side.size < 2:
+        return 0.0
+    price_move = np.diff(mid_price)
+    prev_side = side[:-1]
+    adverse = ((prev_side == BUY) & (price_move < 0)) | ((prev_side == SELL) & (price_move > 0))
+    return -float(np.abs(price_move).dot(quantity[:-1] * adverse))
+
+
+def _spread_capture(spread_vs_mid: np.ndarray, quantity: np.ndarray) -> float:
+    """Sum of per-trade edge versus mid times quantity."""
+    pnl = 0.0
+    for i in range(spread_vs_mid.size):
+        pnl += spread_vs_mid[i] * quantity[i]
+    return pnl
+
+
+def _spread_capture_numpy(spread_vs_mid: np.ndarray, quantity: np.ndarray) -> float:
+    """Vectorized NumPy equivalent of _spread_capture."""
+    return float(np.dot(spread_vs_mid, quantity))
+
+
+# (exported name, signature, implementation) for the AOT build
+AOT_EXPORTS = [
+    ('inventory_pnl', 'f8(f8[:], f8[:])', _inventory_pnl),
+    ('adverse_selection', 'f8(i1[:], f8[:], f8[:])', _adverse_selection),
+    ('spread_capture', 'f8(f8[:], f8[:])', _spread_capture),
+]
+
+_mm_kernels = None
+if not DISABLE_NUMBA:
+    try:
+        from . import _mm_kernels
+    except ImportError:
+        pass
+
+if _mm_kernels is not None:
+    inventory_pnl = _mm_kernels.inventory_pnl
+    adverse_selection = _mm_kernels.adverse_selection
+    spread_capture = _mm_kernels.spread_capture
+elif njit is not None:
+    inventory_pnl = njit(cache=True, fastmath=True)(_inventory_pnl)
+    adverse_selection = njit(cache=True, fastmath=True)(_adverse_selection)
+    spread_capture = njit(cache=True, fastmath=True)(_spread_capture)
+else:
+    # Numba disabled or not installed
+    inventory_pnl = _inventory_pnl_numpy
+    adverse_selection = _adverse_selection_numpy
+    spread_capture = _spread_capture_numpy
@@ -5,6 +5,13 @@ Handles performance metrics, decomposition, and reporting.
 """
 
 from .pnl_tracker import PnLTracker
-from .plotter import SimulationPlotter
 
 __all__ = ["PnLTracker", "SimulationPlotter"]
+
+
+def __getattr__(name):
+    # Loaded on first access so importing analytics doesn't pull in matplotlib
+    if name == "SimulationPlotter":
+        from .plotter import SimulationPlotter
+        return SimulationPlotter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,27 +2,54 @@
 Plotting utilities for market-making simulation results.
 
 Visualizes PnL components, inventory, price movements, and trade activity.
+
+matplotlib is imported inside the plotting methods, so importing this module
+(or the package) stays cheap for code that never plots.
 """
 
-from typing import List, Dict
-import matplotlib.pyplot as plt
+from typing import Dict, TYPE_CHECKING
+import numpy as np
+from .._columns import BUY, SELL
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from ..engine import History
 
 
 class SimulationPlotter:
     """Creates visualizations of market-making simulation results."""
     
-    def __init__(self, figsize: tuple = (14, 10)):
+    def __init__(self, figsize: tuple = (14, 10), reuse_figures: bool = False):
         """
         Initialize the plotter.
         
         Args:
             figsize: Figure size (width, height) in inches
+            reuse_figures: Redraw each plot type into the same Figure on
+                repeated calls instead of opening a new one (useful when
+                batch-plotting many scenarios)
         """
         self.figsize = figsize
+        self.reuse_figures = reuse_figures
+        self._figures: Dict[str, "Figure"] = {}
+    
+    def _get_figure(self, key: str, figsize: tuple) -> "Figure":
+        """Get a cleared Figure for a plot type, creating it if needed."""
+        import matplotlib.pyplot as plt
+        
+        fig = self._figures.get(key)
+        if fig is not None and plt.fignum_exists(fig.number):
+            fig.clf()
+            return fig
+        
+        fig = plt.figure(figsize=figsize)
+        if self.reuse_figures:
+            self._figures[key] = fig
+        return fig
     
     def plot_simulation(
         self,
-        history: List[Dict],
+        history: "History",
         title: str = "Market-Making Simulation Results"
     ):
         """
@@ -36,14 +63,15 @@ class SimulationPlotter:
             print("No history to plot")
             return
         
-        # Extract data from history
-        times = [h['time'] for h in history]
-        mid_prices = [h['mid_price'] for h in history]
-        inventories = [h['inventory'] for h in history]
-        cash_pnl = [h['cash_pnl'] for h in history]
+        # History columns are NumPy arrays and plot directly
+        times = history.time
+        mid_prices = history.mid_price
+        inventories = history.inventory
+        cash_pnl = history.cash_pnl
         
         # Create 2x2 subplot layout
-        fig, axes = plt.subplots(2, 2, figsize=self.figsize)
+        fig = self._get_figure('simulation', self.figsize)
+        axes = fig.subplots(2, 2)
         fig.suptitle(title, fontsize=14, fontweight='bold')
         
         # Plot 1: Price over time
@@ -57,7 +85,7 @@ class SimulationPlotter:
         
         # Plot 2: Inventory over time
         ax = axes[0, 1]
-        colors = ['green' if inv >= 0 else 'red' for inv in inventories]
+        colors = np.where(inventories >= 0, 'green', 'red')
         ax.bar(times, inventories, color=colors, alpha=0.6, width=0.8)
         ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
         ax.set_xlabel('Time (steps)')
@@ -67,7 +95,6 @@ class SimulationPlotter:
         
         # Plot 3: Cash PnL over time (cumulative)
         ax = axes[1, 0]
-        colors_pnl = ['green' if p >= 0 else 'red' for p in cash_pnl]
         ax.fill_between(times, cash_pnl, alpha=0.3, color='blue')
         ax.plot(times, cash_pnl, 'b-', linewidth=2)
         ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
@@ -81,13 +108,14 @@ class SimulationPlotter:
         ax.axis('off')
         
         # Calculate stats
-        final_inventory = inventories[-1] if inventories else 0
-        final_pnl = cash_pnl[-1] if cash_pnl else 0
-        max_inventory = max(inventories) if inventories else 0
-        min_inventory = min(inventories) if inventories else 0
-        final_price = mid_prices[-1] if mid_prices else 0
-        initial_price = mid_prices[0] if mid_prices else 0
+        final_inventory = inventories[-1]
+        final_pnl = cash_pnl[-1]
+        max_inventory = inventories.max()
+        min_inventory = inventories.min()
+        final_price = mid_prices[-1]
+        initial_price = mid_prices[0]
         price_change = final_price - initial_price
+        num_trades = np.count_nonzero(history.trade_side >= 0)
         
         stats_text = f"""
 SIMULATION SUMMARY
@@ -104,12 +132,13 @@ Inventory:
 
 Performance:
   Total PnL: ${final_pnl:.2f}
-  Num Trades: {len(history)}
+  Num Trades: {num_trades}
 """
         ax.text(0.1, 0.5, stats_text, fontsize=11, family='monospace',
                 verticalalignment='center')
         
-        plt.tight_layout()
+        fig.tight_layout()
+        fig.canvas.draw_idle()
         return fig
     
     def plot_pnl_decomposition(
@@ -128,7 +157,8 @@ Performance:
             adverse_selection: Adverse selection cost
             title: Title for the plot
         """
-        fig, ax = plt.subplots(figsize=(10, 6))
+        fig = self._get_figure('pnl_decomposition', (10, 6))
+        ax = fig.subplots()
         
         components = ['Spread Capture', 'Inventory Risk', 'Adverse Selection']
         values = [spread_capture, inventory_pnl, adverse_selection]
@@ -157,12 +187,13 @@ Performance:
                verticalalignment='top', horizontalalignment='right',
                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
         
-        plt.tight_layout()
+        fig.tight_layout()
+        fig.canvas.draw_idle()
         return fig
     
     def plot_price_with_trades(
         self,
-        history: List[Dict],
+        history: "History",
         title: str = "Price Movement with Trades"
     ):
         """
@@ -176,36 +207,28 @@ Performance:
             print("No history to plot")
             return
         
-        fig, ax = plt.subplots(figsize=(12, 6))
+        fig = self._get_figure('price_with_trades', (12, 6))
+        ax = fig.subplots()
         
-        times = [h['time'] for h in history]
-        mid_prices = [h['mid_price'] for h in history]
+        times = history.time
+        mid_prices = history.mid_price
         
         # Plot price
         ax.plot(times, mid_prices, 'b-', linewidth=2, label='Mid Price')
         
-        # Mark trades if available
-        buy_times = []
-        buy_prices = []
-        sell_times = []
-        sell_prices = []
-        
-        for h in history:
-            if 'last_trade' in h and h['last_trade']:
-                trade = h['last_trade']
-                if trade['side'] == 'buy':
-                    buy_times.append(h['time'])
-                    buy_prices.append(h['mid_price'])
-                else:
-                    sell_times.append(h['time'])
-                    sell_prices.append(h['mid_price'])
-        
-        if buy_times:
-            ax.scatter(buy_times, buy_prices, color='green', marker='^', 
-                      s=100, label='Buy Trades', zorder=5)
-        if sell_times:
-            ax.scatter(sell_times, sell_prices, color='red', marker='v', 
-                      s=100, label='Sell Trades', zorder=5)
+        # Mark trades; steps without a fill have the NO_TRADE (-1) side code
+        trade_side = history.trade_side
+        has_trade = trade_side >= 0
+        
+        if has_trade.any():
+            buy_mask = trade_side == BUY
+            sell_mask = trade_side == SELL
+            if buy_mask.any():
+                ax.scatter(times[buy_mask], mid_prices[buy_mask], color='green', marker='^', 
+                          s=100, label='Buy Trades', zorder=5)
+            if sell_mask.any():
+                ax.scatter(times[sell_mask], mid_prices[sell_mask], color='red', marker='v', 
+                          s=100, label='Sell Trades', zorder=5)
         
         ax.set_xlabel('Time (steps)', fontsize=11)
         ax.set_ylabel('Price ($)', fontsize=11)
@@ -213,9 +236,12 @@ Performance:
         ax.legend(loc='best')
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
+        fig.tight_layout()
+        fig.canvas.draw_idle()
         return fig
     
     def show(self):
         """Display all open plots."""
+        import matplotlib.pyplot as plt
+        
         plt.show()
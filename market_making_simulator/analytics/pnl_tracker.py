@@ -4,52 +4,181 @@ PnLTracker implementation.
 Decomposes PnL into spread capture, inventory risk, and adverse selection.
 """
 
-from typing import Dict, List, Tuple
+import functools
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import numpy as np
+from .._columns import BUY, SELL, ColumnBuffer
+from .._kernels import adverse_selection, inventory_pnl, spread_capture
+
+_SIDE_MAP = {'buy': BUY, 'sell': SELL}
+
+
+def _memoized(method: Callable) -> Callable:
+    """Cache a PnLTracker getter's result until new data is recorded."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        if self._dirty:
+            self._cache.clear()
+            self._dirty = False
+        if name not in self._cache:
+            self._cache[name] = method(self)
+        return self._cache[name]
+
+    return wrapper
 
 
 class PnLTracker:
     """
     Tracks and decomposes PnL into different components.
-    
+
     Components:
     - Spread capture: PnL from bid-ask spread
     - Inventory risk: PnL from holding inventory during price moves
     - Adverse selection: PnL loss from trading with informed traders
+
+    Trades and inventory snapshots are stored column-wise in NumPy arrays.
+    Spread capture and inventory PnL are additive and accumulated online;
+    adverse selection looks ahead to the next trade and runs as a compiled
+    Numba kernel over the trade columns.
     """
-    
+
     def __init__(self):
         """Initialize the PnL tracker."""
-        self.trades: List[Dict] = []
-        self.inventory_snapshots: List[Tuple[float, float, float]] = []  # (time, inventory, mid_price)
-        
+        self._trades = ColumnBuffer({
+            'timestamp': np.float64,
+            'price': np.float64,
+            'quantity': np.float64,
+            'mid_price': np.float64,
+            'side': np.int8,
+            'spread_vs_mid': np.float64,
+        })
+        self._snapshots = ColumnBuffer({
+            'timestamp': np.float64,
+            'inventory': np.float64,
+            'mid_price': np.float64,
+        })
+        # Getter results, invalidated by record_* and reset()
+        self._cache: Dict[str, object] = {}
+        self._dirty = True
+        self._reset_accumulators()
+
+    def _reset_accumulators(self):
+        """Zero the running sums for the additive PnL components."""
+        self._spread_capture = 0.0
+        self._inventory_pnl = 0.0
+        self._last_inventory = 0.0
+        self._last_mid: Optional[float] = None
+
+    @property
+    def trades(self) -> List[Dict]:
+        """Recorded trades as a list of dicts (materialized on access)."""
+        buf = self._trades
+        return [
+            {
+                'timestamp': timestamp,
+                'side': 'buy' if side == BUY else 'sell',
+                'price': price,
+                'quantity': quantity,
+                'mid_price': mid_price,
+                'spread_vs_mid': spread_vs_mid,
+            }
+            for timestamp, side, price, quantity, mid_price, spread_vs_mid in zip(
+                buf.view('timestamp').tolist(),
+                buf.view('side').tolist(),
+                buf.view('price').tolist(),
+                buf.view('quantity').tolist(),
+                buf.view('mid_price').tolist(),
+                buf.view('spread_vs_mid').tolist(),
+            )
+        ]
+
+    @property
+    def inventory_snapshots(self) -> List[Tuple[float, float, float]]:
+        """Recorded (time, inventory, mid_price) snapshots (materialized on access)."""
+        buf = self._snapshots
+        return list(zip(
+            buf.view('timestamp').tolist(),
+            buf.view('inventory').tolist(),
+            buf.view('mid_price').tolist(),
+        ))
+
+    def reset(self):
+        """Clear all recorded data, keeping buffers allocated for reuse."""
+        self._trades.clear()
+        self._snapshots.clear()
+        self._reset_accumulators()
+        self._dirty = True
+
     def record_trade(
         self,
         timestamp: float,
-        side: str,
+        side: Union[str, int],
         price: float,
         quantity: float,
         mid_price: float
     ):
         """
         Record a trade.
-        
+
         Args:
             timestamp: Time of trade
-            side: 'buy' or 'sell'
+            side: 'buy' or 'sell', or the BUY/SELL side code (anything
+                else raises ValueError)
             price: Execution price
             quantity: Trade quantity
             mid_price: Mid price at time of trade
         """
-        self.trades.append({
-            'timestamp': timestamp,
-            'side': side,
-            'price': price,
-            'quantity': quantity,
-            'mid_price': mid_price,
-            'spread_vs_mid': price - mid_price if side == 'sell' else mid_price - price
-        })
-    
+        side_code = _SIDE_MAP.get(side, side)
+        if side_code not in (BUY, SELL):
+            raise ValueError(f"Unknown trade side: {side!r}")
+        # Sells capture price above mid, buys capture price below mid
+        spread_vs_mid = (2 * side_code - 1) * (price - mid_price)
+        self._trades.append(timestamp, price, quantity, mid_price, side_code, spread_vs_mid)
+        self._spread_capture += spread_vs_mid * quantity
+        self._dirty = True
+
+    def record_trade_batch(
+        self,
+        timestamps: np.ndarray,
+        sides: np.ndarray,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+        mid_prices: np.ndarray
+    ):
+        """
+        Record many trades at once.
+
+        Equivalent to calling record_trade for each element, but writes whole
+        arrays into the trade buffer.
+
+        Args:
+            timestamps: Times of trades
+            sides: BUY/SELL side codes, or 'buy'/'sell' (anything else
+                raises ValueError)
+            prices: Execution prices
+            quantities: Trade quantities
+            mid_prices: Mid prices at time of each trade
+        """
+        sides = np.asarray(sides)
+        if sides.dtype.kind in 'UO':
+            sides = np.array([_SIDE_MAP.get(side, side) for side in sides.tolist()], dtype=object)
+        valid = (sides == BUY) | (sides == SELL)
+        if not valid.all():
+            raise ValueError(f"Unknown trade side: {sides[~valid].tolist()[0]!r}")
+        sides = sides.astype(np.int8)
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        mid_prices = np.asarray(mid_prices, dtype=np.float64)
+        if sides.size == 0:
+            return
+
+        spread_vs_mid = (2.0 * sides - 1.0) * (prices - mid_prices)
+        self._trades.extend(timestamps, prices, quantities, mid_prices, sides, spread_vs_mid)
+        self._spread_capture += spread_capture(spread_vs_mid, quantities)
+        self._dirty = True
+
     def record_inventory_snapshot(
         self,
         timestamp: float,
@@ -58,108 +187,167 @@ class PnLTracker:
     ):
         """
         Record inventory state at a point in time.
-        
+
         Args:
             timestamp: Time of snapshot
             inventory: Current inventory
             mid_price: Current mid price
         """
-        self.inventory_snapshots.append((timestamp, inventory, mid_price))
-    
+        self._snapshots.append(timestamp, inventory, mid_price)
+        # PnL from price movement on previous inventory
+        if self._last_mid is not None:
+            self._inventory_pnl += self._last_inventory * (mid_price - self._last_mid)
+        self._last_inventory = inventory
+        self._last_mid = mid_price
+        self._dirty = True
+
+    def record_inventory_snapshot_batch(
+        self,
+        timestamps: np.ndarray,
+        inventories: np.ndarray,
+        mid_prices: np.ndarray
+    ):
+        """
+        Record many inventory snapshots at once.
+
+        Equivalent to calling record_inventory_snapshot for each element.
+
+        Args:
+            timestamps: Times of snapshots
+            inventories: Inventory at each snapshot
+            mid_prices: Mid price at each snapshot
+        """
+        inventories = np.ascontiguousarray(inventories, dtype=np.float64)
+        mid_prices = np.ascontiguousarray(mid_prices, dtype=np.float64)
+        if inventories.size == 0:
+            return
+
+        self._snapshots.extend(timestamps, inventories, mid_prices)
+        if self._last_mid is not None:
+            self._inventory_pnl += self._last_inventory * (mid_prices[0] - self._last_mid)
+        self._inventory_pnl += inventory_pnl(inventories, mid_prices)
+        self._last_inventory = float(inventories[-1])
+        self._last_mid = float(mid_prices[-1])
+        self._dirty = True
+
+    def _extend_run(
+        self,
+        trades: Tuple[np.ndarray, ...],
+        snapshots: Tuple[np.ndarray, ...],
+        spread_capture: float,
+        inventory_pnl: float
+    ):
+        """
+        Record a compiled run's trades and snapshots with its PnL components
+        already summed.
+
+        Equivalent to record_trade_batch(*trades) followed by
+        record_inventory_snapshot_batch(*snapshots), where spread_capture and
+        inventory_pnl are the sums those calls would accumulate (the latter
+        excluding the move from the previously recorded snapshot).
+        """
+        timestamps, sides, prices, quantities, mid_prices = trades
+        if sides.size:
+            spread_vs_mid = (2.0 * sides - 1.0) * (prices - mid_prices)
+            self._trades.extend(timestamps, prices, quantities, mid_prices, sides, spread_vs_mid)
+        self._spread_capture += spread_capture
+
+        timestamps, inventories, mid_prices = snapshots
+        if inventories.size:
+            self._snapshots.extend(timestamps, inventories, mid_prices)
+            if self._last_mid is not None:
+                self._inventory_pnl += self._last_inventory * (mid_prices[0] - self._last_mid)
+            self._last_inventory = float(inventories[-1])
+            self._last_mid = float(mid_prices[-1])
+        self._inventory_pnl += inventory_pnl
+        self._dirty = True
+
+    def get_trade_arrays(self) -> Dict[str, np.ndarray]:
+        """Get recorded trades column-wise (read-only views, side as BUY/SELL codes)."""
+        return self._trades.arrays()
+
+    def get_snapshot_arrays(self) -> Dict[str, np.ndarray]:
+        """Get recorded inventory snapshots column-wise (read-only views)."""
+        return self._snapshots.arrays()
+
     def get_spread_capture(self) -> float:
         """
         Calculate PnL from spread capture.
-        
-        This is the theoretical PnL from buying at bid and selling at ask.
-        
+
+        This is the theoretical PnL from buying at bid and selling at ask,
+        accumulated as trades are recorded.
+
         Returns:
             Spread capture PnL
         """
-        spread_pnl = sum(trade['spread_vs_mid'] * trade['quantity'] for trade in self.trades)
-        return spread_pnl
-    
+        return float(self._spread_capture)
+
     def get_inventory_pnl(self) -> float:
         """
         Calculate PnL from inventory risk (price moves while holding inventory).
-        
+
+        Accumulated as snapshots are recorded.
+
         Returns:
             Inventory risk PnL
         """
-        if len(self.inventory_snapshots) < 2:
-            return 0.0
-        
-        inventory_pnl = 0.0
-        for i in range(1, len(self.inventory_snapshots)):
-            prev_time, prev_inv, prev_mid = self.inventory_snapshots[i-1]
-            curr_time, curr_inv, curr_mid = self.inventory_snapshots[i]
-            
-            # PnL from price movement on previous inventory
-            price_change = curr_mid - prev_mid
-            inventory_pnl += prev_inv * price_change
-            
-        return inventory_pnl
-    
+        return float(self._inventory_pnl)
+
+    @_memoized
     def get_adverse_selection_cost(self) -> float:
         """
         Estimate adverse selection cost.
-        
+
         Adverse selection occurs when we trade with informed traders who know
         the price is about to move. This is estimated by looking at price moves
-        after our trades.
-        
+        after our trades: if we bought and price went down, or sold and price
+        went up, we traded with informed traders.
+
         Returns:
             Estimated adverse selection cost
         """
-        if len(self.trades) < 2:
+        if self._trades.size < 2:
             return 0.0
-        
-        adverse_selection = 0.0
-        
-        for i in range(len(self.trades) - 1):
-            trade = self.trades[i]
-            next_trade = self.trades[i + 1]
-            
-            # Look at price move after trade
-            price_move = next_trade['mid_price'] - trade['mid_price']
-            
-            # If we bought and price went down, or sold and price went up,
-            # this is adverse selection (we traded with informed traders)
-            if trade['side'] == 'buy' and price_move < 0:
-                adverse_selection += abs(price_move) * trade['quantity']
-            elif trade['side'] == 'sell' and price_move > 0:
-                adverse_selection += abs(price_move) * trade['quantity']
-                
-        return -adverse_selection  # Negative because it's a cost
-    
+
+        # Negative because it's a cost
+        return adverse_selection(
+            self._trades.view('side'),
+            self._trades.view('mid_price'),
+            self._trades.view('quantity'),
+        )
+
     def get_pnl_decomposition(self) -> Dict[str, float]:
         """
         Get complete PnL decomposition.
-        
+
+        Components are cached, so repeated calls between recordings are O(1).
+
         Returns:
             Dictionary with PnL components
         """
         spread_capture = self.get_spread_capture()
         inventory_pnl = self.get_inventory_pnl()
         adverse_selection = self.get_adverse_selection_cost()
-        
+
         return {
             'spread_capture': spread_capture,
             'inventory_pnl': inventory_pnl,
             'adverse_selection': adverse_selection,
             'total_pnl': spread_capture + inventory_pnl + adverse_selection
         }
-    
+
+    @_memoized
     def get_trade_count(self) -> Tuple[int, int]:
         """
         Get count of buy and sell trades.
-        
+
         Returns:
             Tuple of (num_buys, num_sells)
         """
-        num_buys = sum(1 for t in self.trades if t['side'] == 'buy')
-        num_sells = sum(1 for t in self.trades if t['side'] == 'sell')
+        num_buys = int(np.count_nonzero(self._trades.view('side') == BUY))
+        num_sells = self._trades.size - num_buys
         return (num_buys, num_sells)
-    
+
     def __repr__(self) -> str:
         decomp = self.get_pnl_decomposition()
         return (f"PnLTracker(spread={decomp['spread_capture']:.2f}, "
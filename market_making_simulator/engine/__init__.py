@@ -5,6 +5,8 @@ Includes order book, price dynamics, and simulation orchestration.
 """
 
 from .order_book import OrderBook
+from .history import History
 from .simulator import MarketSimulator
+from .batch import MarketSimulatorBatch
 
-__all__ = ["OrderBook", "MarketSimulator"]
+__all__ = ["OrderBook", "History", "MarketSimulator", "MarketSimulatorBatch"]
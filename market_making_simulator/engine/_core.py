@@ -0,0 +1,156 @@
+"""
+Compiled simulation loop.
+
+A scalar version of MarketSimulator's step loop for the stock OrderBook,
+MarketMaker and PnLTracker. The market maker and risk manager enter as
+MarketMakerState/MarketMakerConfig and RiskConfig tuples and their logic is
+the compiled form of the same free functions the classes delegate to, so the
+whole run executes as one Numba-compiled function writing step outputs into
+preallocated arrays. ``specialized_run_core`` compiles variants with the
+market maker and risk parameters baked in. Both are None when Numba is
+unavailable or disabled.
+"""
+
+import functools
+import math
+import numpy as np
+from .._columns import NO_TRADE
+from .._kernels import njit
+from ..risk.risk_manager import RiskConfig, apply_risk_controls
+from ..strategy.market_maker import (
+    MarketMakerConfig, MarketMakerState, apply_ask_fill, apply_bid_fill, compute_quotes
+)
+
+# NaN marks "no trade" and an unset drawdown limit is infinite, so the
+# no-NaN/no-inf fast-math assumptions are left out
+FASTMATH = {'nsz', 'arcp', 'contract', 'afn'}
+
+# Risk controls that leave quotes unchanged, for market makers without a risk manager
+NO_RISK = RiskConfig(False, math.inf, False, 0.0)
+
+
+def _run_core(
+    time0: float,
+    dt: float,
+    mid0: float,
+    state: MarketMakerState,
+    config: MarketMakerConfig,
+    risk: RiskConfig,
+    sigma_eff: float,
+    order: np.ndarray,
+    shocks: np.ndarray,
+):
+    """
+    Simulate len(shocks) steps of market making from the given state.
+
+    Args:
+        time0: Simulation time before the first step
+        dt: Time step
+        mid0: Mid price before the first step
+        state: Market maker position before the first step
+        config: Market maker quoting parameters
+        risk: Risk controls applied to every quote (NO_RISK for none)
+        sigma_eff: GBM shock scale, volatility * sqrt(dt), fixed for the run
+        order: Direction of each step's market order (+1 buy, -1 sell, 0 none)
+        shocks: Standard normal price shock of each step
+
+    Returns:
+        Tuple of (time, mid_price, bid_price, ask_price, inventory,
+        trade_side, trade_price, trade_quantity, cash_pnl, total_pnl) step
+        arrays, followed by the final MarketMakerState, the run's spread
+        capture and its inventory PnL between consecutive steps (the move
+        from mid0 to the first step is left to the caller)
+    """
+    n = shocks.size
+    time = np.empty(n)
+    mid_price = np.empty(n)
+    bid_price = np.empty(n)
+    ask_price = np.empty(n)
+    inventory = np.empty(n)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_price = np.empty(n)
+    trade_quantity = np.empty(n)
+    cash_pnl = np.empty(n)
+    total_pnl = np.empty(n)
+
+    t = time0
+    mid = mid0
+    # PnL components accumulated from the values already at hand, as
+    # PnLTracker would from the recorded trades and snapshots
+    spread_capture = 0.0
+    inventory_pnl = 0.0
+
+    for i in range(n):
+        t += dt
+        held = state.inventory
+
+        bid, bid_size, ask, ask_size = _compute_quotes(state, config, mid)
+        bid, bid_size, ask, ask_size, _ = _apply_risk_controls(
+            risk, bid, bid_size, ask, ask_size, state.inventory, config.max_inventory,
+            state.total_sell_value - state.total_buy_value,
+        )
+
+        # Fills as 0/1 masks: market buys hit our ask, market sells our bid.
+        # Quantities are zero on the side that didn't fill, so both fills are
+        # applied every step and the stores compile to selects.
+        hits_ask = (order[i] == 1) & (ask_size > 0)
+        hits_bid = (order[i] == -1) & (bid_size > 0)
+        traded = hits_ask | hits_bid
+        ask_qty = ask_size * hits_ask
+        bid_qty = bid_size * hits_bid
+        state = _apply_ask_fill(_apply_bid_fill(state, bid, bid_qty), ask, ask_qty)
+
+        # NO_TRADE (-1) without a fill, BUY (0) on the bid, SELL (1) on the ask
+        trade_side[i] = NO_TRADE + traded * (1 + hits_ask)
+        trade_price[i] = ask * hits_ask + bid * hits_bid if traded else np.nan
+        trade_quantity[i] = ask_qty + bid_qty if traded else np.nan
+
+        spread_capture += (ask - mid) * ask_qty + (mid - bid) * bid_qty
+
+        new_mid = mid * math.exp(sigma_eff * shocks[i])
+        if i > 0:
+            inventory_pnl += held * (new_mid - mid)
+        mid = new_mid
+
+        time[i] = t
+        mid_price[i] = mid
+        bid_price[i] = bid
+        ask_price[i] = ask
+        inventory[i] = state.inventory
+        cash_pnl[i] = state.total_sell_value - state.total_buy_value
+        total_pnl[i] = state.inventory * mid - (state.total_buy_value - state.total_sell_value)
+
+    return (time, mid_price, bid_price, ask_price, inventory,
+            trade_side, trade_price, trade_quantity, cash_pnl, total_pnl, state,
+            spread_capture, inventory_pnl)
+
+
+def _specialize_run_core(config: MarketMakerConfig, risk: RiskConfig):
+    """
+    Compile run_core with config and risk as compile-time constants.
+
+    The returned function takes the remaining run_core arguments. With the
+    loop inlined around constant parameters, LLVM can fold the quote and risk
+    arithmetic and drop disabled risk branches. Each distinct pair costs a
+    fresh compilation that is not cached on disk, so this only pays off when
+    the same parameters are run many times in one process.
+    """
+    def run(time0, dt, mid0, state, sigma_eff, order, shocks):
+        return _run_core_inline(time0, dt, mid0, state, config, risk, sigma_eff, order, shocks)
+
+    return njit(fastmath=FASTMATH)(run)
+
+
+if njit is not None:
+    _jit = njit(cache=True, fastmath=FASTMATH)
+    _compute_quotes = _jit(compute_quotes)
+    _apply_bid_fill = _jit(apply_bid_fill)
+    _apply_ask_fill = _jit(apply_ask_fill)
+    _apply_risk_controls = _jit(apply_risk_controls)
+    run_core = _jit(_run_core)
+    _run_core_inline = njit(inline='always', fastmath=FASTMATH)(_run_core)
+    # Keyed on the exact parameter values, so results match run_core
+    specialized_run_core = functools.lru_cache(maxsize=32)(_specialize_run_core)
+else:
+    run_core = None
+    specialized_run_core = None
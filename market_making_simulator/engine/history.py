@@ -0,0 +1,120 @@
+"""
+Simulation history storage.
+
+Records per-step simulator state column-wise in NumPy arrays.
+"""
+
+from typing import Dict, List, Union
+import numpy as np
+from .._columns import _INITIAL_CAPACITY, BUY, NO_TRADE, ColumnBuffer
+
+HISTORY_COLUMNS = {
+    'time': np.float64,
+    'mid_price': np.float64,
+    'bid_price': np.float64,
+    'ask_price': np.float64,
+    'inventory': np.float64,
+    'trade_side': np.int8,
+    'trade_price': np.float64,
+    'trade_quantity': np.float64,
+    'cash_pnl': np.float64,
+    'total_pnl': np.float64,
+}
+
+
+class History(ColumnBuffer):
+    """
+    Column-wise simulation history.
+
+    Each column in HISTORY_COLUMNS is available as an attribute holding a
+    NumPy view of the recorded steps (e.g. ``history.mid_price``), so
+    analytics can slice and mask whole columns instead of walking dicts.
+    ``trade_side`` is BUY/SELL for the market maker's side of a fill and
+    NO_TRADE when no fill happened; trade price and quantity are NaN then.
+
+    Indexing (``history[i]``) still returns a per-step dict (a list of them
+    for a slice), and ``to_frame()`` builds a pandas DataFrame on demand.
+    """
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        """
+        Initialize an empty history.
+
+        Args:
+            capacity: Number of steps to preallocate
+        """
+        super().__init__(HISTORY_COLUMNS, capacity)
+
+    @classmethod
+    def allocate(cls, num_steps: int) -> "History":
+        """Create a history with room for `num_steps` steps."""
+        return cls(capacity=max(num_steps, 1))
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "History":
+        """Rebuild a history from columns as returned by arrays()."""
+        history = cls.allocate(len(arrays['time']))
+        history.extend(*(arrays[name] for name in HISTORY_COLUMNS))
+        return history
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name][:self.size]
+        raise AttributeError(f"'History' object has no attribute '{name}'")
+
+    @property
+    def n(self) -> int:
+        """Number of recorded steps."""
+        return self.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Dict, List[Dict]]:
+        """
+        Get one step as a dict with the same keys MarketSimulator.step returns.
+
+        A slice returns the list of step dicts it selects.
+        """
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.size))]
+        if not isinstance(i, (int, np.integer)):
+            raise TypeError(f"history indices must be integers or slices, not {type(i).__name__}")
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("history index out of range")
+
+        row = {name: column[i].item() for name, column in self.columns.items()}
+        side = row['trade_side']
+        trade_occurred = side != NO_TRADE
+        return {
+            'time': row['time'],
+            'mid_price': row['mid_price'],
+            'bid_price': row['bid_price'],
+            'ask_price': row['ask_price'],
+            'inventory': row['inventory'],
+            'trade_occurred': trade_occurred,
+            'trade_side': ('buy' if side == BUY else 'sell') if trade_occurred else None,
+            'trade_price': row['trade_price'] if trade_occurred else None,
+            'trade_quantity': row['trade_quantity'] if trade_occurred else None,
+            'cash_pnl': row['cash_pnl'],
+            'total_pnl': row['total_pnl'],
+        }
+
+    def to_frame(self):
+        """
+        Get the history as a pandas DataFrame indexed by step.
+
+        pandas is imported on first use, and the frame is built from the
+        recorded columns only when requested.
+
+        Returns:
+            DataFrame with one column per history field
+        """
+        import pandas as pd
+        return pd.DataFrame(self.arrays())
+
+    def __repr__(self) -> str:
+        return f"History(steps={self.size})"
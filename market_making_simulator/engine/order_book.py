@@ -15,6 +15,8 @@ class OrderBook:
     Tracks mid price, bid/ask spread, and depth at different levels.
     """
     
+    __slots__ = ('mid_price', 'spread', 'depth_per_level', 'num_levels')
+    
     def __init__(
         self,
         initial_mid: float = 100.0,
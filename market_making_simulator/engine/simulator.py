@@ -4,10 +4,50 @@ MarketSimulator implementation.
 Orchestrates the simulation of market-making activity over time.
 """
 
-from typing import List, Dict, Optional
+import itertools
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 import numpy as np
+from .._columns import BUY, NO_TRADE, SELL
+from ..analytics.pnl_tracker import PnLTracker
+from ..risk.risk_manager import RiskManager
+from ..strategy.market_maker import MarketMaker, MarketMakerConfig, MarketMakerState
+from ._core import NO_RISK, run_core, specialized_run_core
+from .history import History
 from .order_book import OrderBook
 
+# Signed direction of an incoming market order: +1 buy, -1 sell, 0 none
+_ORDER_DIRECTION = {'buy': 1, 'sell': -1, None: 0}
+
+# Grid parameters accepted by run_grid, by the component they configure
+_ORDER_BOOK_PARAMS = ('initial_mid', 'spread', 'depth_per_level', 'num_levels')
+_MARKET_MAKER_PARAMS = ('quote_spread', 'quote_size', 'max_inventory', 'inventory_skew_factor')
+_RUN_PARAMS = ('num_steps', 'volatility', 'arrival_rate', 'dt')
+_GRID_PARAMS = frozenset(_ORDER_BOOK_PARAMS + _MARKET_MAKER_PARAMS + _RUN_PARAMS + ('random_seed',))
+
+
+def _run_config(config: Dict) -> Dict:
+    """
+    Build and run one simulator from a flat parameter dict.
+
+    Top-level (picklable) so run_grid can dispatch it to worker processes.
+
+    Args:
+        config: OrderBook, MarketMaker and run() parameters plus random_seed
+
+    Returns:
+        The config merged with the simulator's summary
+    """
+    order_book = OrderBook(**{k: config[k] for k in _ORDER_BOOK_PARAMS if k in config})
+    market_maker = MarketMaker(**{k: config[k] for k in _MARKET_MAKER_PARAMS if k in config})
+    simulator = MarketSimulator(order_book, market_maker, PnLTracker(),
+                                random_seed=config.get('random_seed'))
+    simulator.run(**{k: config[k] for k in _RUN_PARAMS if k in config})
+    return {**config, **simulator.get_summary()}
+
 
 class MarketSimulator:
     """
@@ -21,7 +61,8 @@ class MarketSimulator:
         order_book: OrderBook,
         market_maker,  # Strategy object
         pnl_tracker,   # Analytics object
-        random_seed: Optional[int] = None
+        random_seed: Optional[int] = None,
+        rng: Optional[np.random.Generator] = None
     ):
         """
         Initialize the market simulator.
@@ -31,28 +72,44 @@ class MarketSimulator:
             market_maker: Market maker strategy instance
             pnl_tracker: PnL tracker instance
             random_seed: Random seed for reproducibility
+            rng: Generator to draw from instead of seeding a new one from
+                random_seed
         """
         self.order_book = order_book
         self.market_maker = market_maker
         self.pnl_tracker = pnl_tracker
         
-        if random_seed is not None:
-            np.random.seed(random_seed)
+        # Own generator, so simulators don't share (or reseed) global state
+        self._rng = rng if rng is not None else np.random.default_rng(random_seed)
         
         self.current_time = 0.0
-        self.history: List[Dict] = []
+        self.history = History()
+        # volatility * sqrt(dt), recomputed only when either changes
+        self._vol_dt = (None, None)
+        self._vol_sqrt_dt = 0.0
         
-    def simulate_price_move(self, volatility: float = 0.01, dt: float = 1.0):
+    def _price_scale(self, volatility: float, dt: float) -> float:
+        """Get the GBM shock scale volatility * sqrt(dt), cached across steps."""
+        if self._vol_dt != (volatility, dt):
+            self._vol_dt = (volatility, dt)
+            self._vol_sqrt_dt = volatility * math.sqrt(dt)
+        return self._vol_sqrt_dt
+    
+    def simulate_price_move(self, volatility: float = 0.01, dt: float = 1.0) -> float:
         """
         Simulate a price move using geometric Brownian motion.
         
         Args:
             volatility: Price volatility (standard deviation)
             dt: Time step
+            
+        Returns:
+            New mid price, so callers need not read it back from the order book
         """
-        current_mid = self.order_book.get_mid_price()
-        new_mid = current_mid * np.exp(volatility * np.sqrt(dt) * np.random.normal())
+        scale = self._price_scale(volatility, dt)
+        new_mid = self.order_book.mid_price * math.exp(scale * self._rng.standard_normal())
         self.order_book.update_mid_price(new_mid)
+        return new_mid
         
     def simulate_order_flow(self, arrival_rate: float = 0.5) -> Optional[str]:
         """
@@ -64,8 +121,9 @@ class MarketSimulator:
         Returns:
             'buy' or 'sell' if order arrived, None otherwise
         """
-        if np.random.random() < arrival_rate:
-            return 'buy' if np.random.random() < 0.5 else 'sell'
+        rng = self._rng
+        if rng.random() < arrival_rate:
+            return 'buy' if rng.random() < 0.5 else 'sell'
         return None
     
     def step(
@@ -85,71 +143,147 @@ class MarketSimulator:
         Returns:
             Dictionary with step results
         """
+        order = _ORDER_DIRECTION[self.simulate_order_flow(arrival_rate)]
+        growth = math.exp(self._price_scale(volatility, dt) * self._rng.standard_normal())
+        self._step(dt, order, growth)
+        return self.history[-1]
+    
+    def _sample_draws(self, num_steps: int, arrival_rate: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pre-sample order flow and price shocks for `num_steps` steps.
+        
+        Returns:
+            Tuple of (order, shocks): the signed direction of each step's
+            market order (+1 buy, -1 sell, 0 if none arrives) as int8 and the
+            standard normal price shock of each step
+        """
+        rng = self._rng
+        arrivals = rng.random(num_steps) < arrival_rate
+        buys = rng.random(num_steps) < 0.5
+        shocks = rng.standard_normal(num_steps)
+        
+        order = (arrivals * (2 * buys - 1)).astype(np.int8)
+        return order, shocks
+    
+    def _step(self, dt: float, order: int, growth: float):
+        """
+        Execute one simulation step, recording it only in the history columns.
+        
+        Args:
+            dt: Time step
+            order: Direction of this step's market order (+1 buy, -1 sell, 0 none)
+            growth: Mid price multiplier for this step's price move
+        """
         self.current_time += dt
+        order_book = self.order_book
+        market_maker = self.market_maker
         
         # Get current state before any changes
-        initial_mid = self.order_book.get_mid_price()
-        initial_inventory = self.market_maker.get_inventory()
+        initial_mid = order_book.mid_price
         
         # Update market maker quotes
-        bid_price, bid_size, ask_price, ask_size = self.market_maker.get_quotes(self.order_book)
+        bid_price, bid_size, ask_price, ask_size = market_maker.get_quotes(order_book)
         
-        # Simulate incoming market orders
-        order_side = self.simulate_order_flow(arrival_rate)
-        trade_occurred = False
-        trade_side = None
-        trade_price = None
-        trade_quantity = None
+        trade_side = NO_TRADE
+        trade_price = np.nan
+        trade_quantity = np.nan
         
-        if order_side == 'buy' and ask_size > 0:
+        if order == 1 and ask_size > 0:
             # Market buy hits our ask
-            trade_side = 'sell'
+            trade_side = SELL
             trade_price = ask_price
             trade_quantity = ask_size
-            self.market_maker.execute_ask_fill(ask_price, ask_size)
+            market_maker.execute_ask_fill(ask_price, ask_size)
             self.pnl_tracker.record_trade(
-                self.current_time, 'sell', ask_price, ask_size, initial_mid
+                self.current_time, SELL, ask_price, ask_size, initial_mid
             )
-            trade_occurred = True
             
-        elif order_side == 'sell' and bid_size > 0:
+        elif order == -1 and bid_size > 0:
             # Market sell hits our bid
-            trade_side = 'buy'
+            trade_side = BUY
             trade_price = bid_price
             trade_quantity = bid_size
-            self.market_maker.execute_bid_fill(bid_price, bid_size)
+            market_maker.execute_bid_fill(bid_price, bid_size)
             self.pnl_tracker.record_trade(
-                self.current_time, 'buy', bid_price, bid_size, initial_mid
+                self.current_time, BUY, bid_price, bid_size, initial_mid
             )
-            trade_occurred = True
         
-        # Simulate price movement
-        self.simulate_price_move(volatility, dt)
+        # Price movement
+        current_mid = initial_mid * growth
+        order_book.update_mid_price(current_mid)
         
         # Record inventory snapshot
-        current_mid = self.order_book.get_mid_price()
-        current_inventory = self.market_maker.get_inventory()
+        current_inventory = market_maker.get_inventory()
         self.pnl_tracker.record_inventory_snapshot(
             self.current_time, current_inventory, current_mid
         )
         
         # Record step history
-        step_data = {
-            'time': self.current_time,
-            'mid_price': current_mid,
-            'bid_price': bid_price,
-            'ask_price': ask_price,
-            'inventory': current_inventory,
-            'trade_occurred': trade_occurred,
-            'trade_side': trade_side,
-            'trade_price': trade_price,
-            'trade_quantity': trade_quantity,
-            'cash_pnl': self.market_maker.get_cash_pnl(),
-            'total_pnl': self.market_maker.get_total_pnl(current_mid)
-        }
-        self.history.append(step_data)
+        self.history.append(
+            self.current_time,
+            current_mid,
+            bid_price,
+            ask_price,
+            current_inventory,
+            trade_side,
+            trade_price,
+            trade_quantity,
+            market_maker.get_cash_pnl(),
+            market_maker.get_total_pnl(current_mid),
+        )
+    
+    def _can_run_compiled(self) -> bool:
+        """Whether run() can use the compiled loop (stock components only)."""
+        return (
+            run_core is not None
+            and type(self.order_book) is OrderBook
+            and type(self.market_maker) is MarketMaker
+            and type(self.market_maker.risk_manager) in (type(None), RiskManager)
+            and type(self.pnl_tracker) is PnLTracker
+        )
+    
+    def _run_compiled(
+        self,
+        dt: float,
+        sigma_eff: float,
+        order: np.ndarray,
+        shocks: np.ndarray,
+        specialize: bool = False
+    ):
+        """Run pre-sampled steps in the compiled loop and write back all state."""
+        if shocks.size == 0:
+            return
+        market_maker = self.market_maker
+        initial_mid = float(self.order_book.mid_price)
+        risk_manager = market_maker.risk_manager
+        state = MarketMakerState(*map(float, market_maker.state))
+        config = MarketMakerConfig(*map(float, market_maker.config))
+        risk = NO_RISK if risk_manager is None else risk_manager.config
+        
+        if specialize:
+            core = specialized_run_core(config, risk)
+            result = core(float(self.current_time), float(dt), initial_mid, state,
+                          float(sigma_eff), order, shocks)
+        else:
+            result = run_core(float(self.current_time), float(dt), initial_mid, state,
+                              config, risk, float(sigma_eff), order, shocks)
+        (*columns, state, spread_capture, inventory_pnl) = result
+        self.history.extend(*columns)
+        time, mid_price, _, _, inventory, trade_side, trade_price, trade_quantity = columns[:8]
         
-        return step_data
+        # Trades are recorded against the mid before that step's price move
+        traded = trade_side != NO_TRADE
+        trade_mid = np.concatenate(([initial_mid], mid_price[:-1]))
+        self.pnl_tracker._extend_run(
+            (time[traded], trade_side[traded], trade_price[traded],
+             trade_quantity[traded], trade_mid[traded]),
+            (time, inventory, mid_price),
+            spread_capture, inventory_pnl,
+        )
+        
+        market_maker.state = state
+        self.order_book.update_mid_price(float(mid_price[-1]))
+        self.current_time = float(time[-1])
     
     def run(
         self,
@@ -157,31 +291,135 @@ class MarketSimulator:
         volatility: float = 0.01,
         arrival_rate: float = 0.5,
         dt: float = 1.0,
-        verbose: bool = False
-    ) -> List[Dict]:
+        verbose: bool = False,
+        specialize: bool = False
+    ) -> History:
         """
         Run the simulation for multiple steps.
         
+        Order arrivals, order sides and price shocks for all steps are drawn
+        from the random generator in three vectorized calls before the loop,
+        and history columns are sized up front, so the loop itself makes no
+        random calls, builds no per-step dicts and never reallocates.
+        
+        With the stock OrderBook, MarketMaker, RiskManager (if any) and
+        PnLTracker, the loop runs as a single Numba-compiled function and
+        the results are written back into the components afterwards.
+        
         Args:
             num_steps: Number of steps to simulate
             volatility: Price volatility
             arrival_rate: Order arrival rate
             dt: Time step
             verbose: Print progress
+            specialize: Compile the loop for this market maker's quoting and
+                risk parameters (cached per parameter set within the
+                process). Worth it when many runs share the same parameters;
+                ignored when the compiled loop is not used
             
         Returns:
-            List of step results
+            Column-wise history of all steps
+        """
+        history = self.history
+        history.reserve(num_steps)
+        start = len(history)
+        order, shocks = self._sample_draws(num_steps, arrival_rate)
+        # volatility and dt are fixed for the whole run
+        sigma_eff = self._price_scale(volatility, dt)
+        
+        if self._can_run_compiled():
+            self._run_compiled(dt, sigma_eff, order, shocks, specialize)
+        else:
+            growth = np.exp(sigma_eff * shocks)
+            for o, g in zip(order.tolist(), growth.tolist()):
+                self._step(dt, o, g)
+        
+        if verbose and num_steps > 0:
+            # Every 10th step and the last, written in one call
+            steps = np.unique(np.append(np.arange(0, num_steps, 10), num_steps - 1))
+            rows = start + steps
+            print("\n".join(
+                f"Step {i+1}/{num_steps}: "
+                f"Mid={mid:.2f}, "
+                f"Inventory={inventory:.2f}, "
+                f"PnL={pnl:.2f}"
+                for i, mid, inventory, pnl in zip(
+                    steps.tolist(),
+                    history.mid_price[rows].tolist(),
+                    history.inventory[rows].tolist(),
+                    history.total_pnl[rows].tolist(),
+                )
+            ))
+        
+        return history
+    
+    @classmethod
+    def run_grid(
+        cls,
+        param_grid: Union[Mapping[str, Sequence], Iterable[Dict]],
+        num_steps: int = 100,
+        random_seed: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[Dict]:
         """
-        for i in range(num_steps):
-            step_data = self.step(volatility, arrival_rate, dt)
+        Run one simulation per parameter combination across worker processes.
+        
+        Each combination builds its own OrderBook, MarketMaker, PnLTracker
+        and simulator, so runs are independent and spread over all cores.
+        
+        Args:
+            param_grid: Either a mapping of parameter name to candidate values
+                (every combination is run) or an iterable of parameter dicts.
+                Accepted names are the OrderBook and MarketMaker constructor
+                arguments, run() arguments and random_seed; any other
+                name raises ValueError.
+            num_steps: Steps per run, unless given in the grid
+            random_seed: Seed for every run, unless given in the grid
+            max_workers: Number of worker processes (defaults to CPU count,
+                1 runs everything in the current process)
+            progress: Optional callback called as progress(done, total) when
+                each run finishes
             
-            if verbose and (i % 10 == 0 or i == num_steps - 1):
-                print(f"Step {i+1}/{num_steps}: "
-                      f"Mid={step_data['mid_price']:.2f}, "
-                      f"Inventory={step_data['inventory']:.2f}, "
-                      f"PnL={step_data['total_pnl']:.2f}")
+        Returns:
+            One dict per combination, in grid order, holding its parameters
+            and get_summary() results
+        """
+        if isinstance(param_grid, Mapping):
+            names = list(param_grid)
+            combos = [dict(zip(names, values))
+                      for values in itertools.product(*param_grid.values())]
+        else:
+            combos = [dict(combo) for combo in param_grid]
+            names = [name for combo in combos for name in combo]
+        unknown = sorted(set(names) - _GRID_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown grid parameters: {', '.join(unknown)}")
+        configs = [{'num_steps': num_steps, 'random_seed': random_seed, **combo}
+                   for combo in combos]
+        
+        total = len(configs)
+        max_workers = min(max_workers or os.cpu_count() or 1, total)
+        if max_workers <= 1:
+            results = []
+            for config in configs:
+                results.append(_run_config(config))
+                if progress is not None:
+                    progress(len(results), total)
+            return results
         
-        return self.history
+        results = [None] * total
+        # Forking a process that has started Numba's parallel worker threads
+        # can deadlock, so workers come from a fork server where available
+        methods = mp.get_all_start_methods()
+        context = mp.get_context('forkserver' if 'forkserver' in methods else None)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {executor.submit(_run_config, config): i for i, config in enumerate(configs)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(done, total)
+        return results
     
     def get_summary(self) -> Dict:
         """
@@ -196,20 +434,22 @@ class MarketSimulator:
         pnl_decomp = self.pnl_tracker.get_pnl_decomposition()
         num_buys, num_sells = self.pnl_tracker.get_trade_count()
         
-        final_state = self.history[-1]
+        history = self.history
+        initial_mid = float(history.mid_price[0])
+        final_mid = float(history.mid_price[-1])
         
         return {
-            'total_steps': len(self.history),
+            'total_steps': len(history),
             'final_time': self.current_time,
-            'initial_mid': self.history[0]['mid_price'],
-            'final_mid': final_state['mid_price'],
-            'price_change': final_state['mid_price'] - self.history[0]['mid_price'],
-            'final_inventory': final_state['inventory'],
+            'initial_mid': initial_mid,
+            'final_mid': final_mid,
+            'price_change': final_mid - initial_mid,
+            'final_inventory': float(history.inventory[-1]),
             'num_trades': num_buys + num_sells,
             'num_buys': num_buys,
             'num_sells': num_sells,
-            'cash_pnl': final_state['cash_pnl'],
-            'total_pnl': final_state['total_pnl'],
+            'cash_pnl': float(history.cash_pnl[-1]),
+            'total_pnl': float(history.total_pnl[-1]),
             'spread_capture': pnl_decomp['spread_capture'],
             'inventory_pnl': pnl_decomp['inventory_pnl'],
             'adverse_selection': pnl_decomp['adverse_selection'],
@@ -223,27 +463,32 @@ class MarketSimulator:
             print("No simulation data available.")
             return
         
-        print("\n" + "="*60)
-        print("MARKET-MAKING SIMULATION SUMMARY")
-        print("="*60)
-        print(f"\nSimulation Details:")
-        print(f"  Total Steps: {summary['total_steps']}")
-        print(f"  Final Time: {summary['final_time']:.1f}")
-        print(f"\nMarket Statistics:")
-        print(f"  Initial Mid Price: ${summary['initial_mid']:.2f}")
-        print(f"  Final Mid Price: ${summary['final_mid']:.2f}")
-        print(f"  Price Change: ${summary['price_change']:.2f} "
-              f"({summary['price_change']/summary['initial_mid']*100:.2f}%)")
-        print(f"\nTrading Activity:")
-        print(f"  Total Trades: {summary['num_trades']}")
-        print(f"  Buys: {summary['num_buys']}")
-        print(f"  Sells: {summary['num_sells']}")
-        print(f"  Final Inventory: {summary['final_inventory']:.2f}")
-        print(f"\nPnL Analysis:")
-        print(f"  Total PnL: ${summary['total_pnl']:.2f}")
-        print(f"  Cash PnL: ${summary['cash_pnl']:.2f}")
-        print(f"\nPnL Decomposition:")
-        print(f"  Spread Capture: ${summary['spread_capture']:.2f}")
-        print(f"  Inventory Risk: ${summary['inventory_pnl']:.2f}")
-        print(f"  Adverse Selection: ${summary['adverse_selection']:.2f}")
-        print("="*60 + "\n")
+        initial_mid = summary['initial_mid']
+        price_change_pct = 0.0 if initial_mid == 0 else summary['price_change'] / initial_mid * 100
+        
+        lines = [
+            "\n" + "="*60,
+            "MARKET-MAKING SIMULATION SUMMARY",
+            "="*60,
+            "\nSimulation Details:",
+            f"  Total Steps: {summary['total_steps']}",
+            f"  Final Time: {summary['final_time']:.1f}",
+            "\nMarket Statistics:",
+            f"  Initial Mid Price: ${initial_mid:.2f}",
+            f"  Final Mid Price: ${summary['final_mid']:.2f}",
+            f"  Price Change: ${summary['price_change']:.2f} ({price_change_pct:.2f}%)",
+            "\nTrading Activity:",
+            f"  Total Trades: {summary['num_trades']}",
+            f"  Buys: {summary['num_buys']}",
+            f"  Sells: {summary['num_sells']}",
+            f"  Final Inventory: {summary['final_inventory']:.2f}",
+            "\nPnL Analysis:",
+            f"  Total PnL: ${summary['total_pnl']:.2f}",
+            f"  Cash PnL: ${summary['cash_pnl']:.2f}",
+            "\nPnL Decomposition:",
+            f"  Spread Capture: ${summary['spread_capture']:.2f}",
+            f"  Inventory Risk: ${summary['inventory_pnl']:.2f}",
+            f"  Adverse Selection: ${summary['adverse_selection']:.2f}",
+            "="*60 + "\n",
+        ]
+        print("\n".join(lines))
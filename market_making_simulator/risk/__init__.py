@@ -4,6 +4,6 @@ Risk layer: Risk management and controls.
 Handles inventory limits, position management, and hedging.
 """
 
-from .risk_manager import RiskManager
+from .risk_manager import RiskConfig, RiskManager, apply_risk_controls
 
-__all__ = ["RiskManager"]
+__all__ = ["RiskManager", "RiskConfig", "apply_risk_controls"]
@@ -1,8 +1,56 @@
-from typing import Optional, Tuple
+import math
+from typing import NamedTuple, Optional, Tuple
+
+
+class RiskConfig(NamedTuple):
+    """Risk control settings (no drawdown limit is stored as infinity)."""
+
+    enable_kill_switch: bool
+    drawdown_limit: float
+    enable_size_throttle: bool
+    min_throttle: float
+
+
+def apply_risk_controls(
+    config: RiskConfig,
+    bid_price: float,
+    bid_size: float,
+    ask_price: float,
+    ask_size: float,
+    inventory: float,
+    max_inventory: float,
+    cash_pnl: float,
+) -> Tuple[float, float, float, float, bool]:
+    """
+    Apply risk controls to quotes.
+
+    Returns adjusted (bid_price, bid_size, ask_price, ask_size, is_active).
+    """
+    is_active = True
+
+    if config.enable_kill_switch:
+        if cash_pnl <= -math.fabs(config.drawdown_limit):
+            return (bid_price, 0.0, ask_price, 0.0, False)
+
+    if config.enable_size_throttle and max_inventory > 0:
+        # Ternaries rather than the generic min()/max() builtins
+        inv_ratio = math.fabs(inventory) / max_inventory
+        inv_ratio = inv_ratio if inv_ratio < 1.0 else 1.0
+        scale = 1.0 - inv_ratio
+        scale = scale if scale > config.min_throttle else config.min_throttle
+        bid_size *= scale
+        ask_size *= scale
+
+    return (bid_price, bid_size, ask_price, ask_size, is_active)
 
 
 class RiskManager:
-    """Simple risk manager for inventory limits, size throttling, and kill-switch."""
+    """
+    Simple risk manager for inventory limits, size throttling, and kill-switch.
+
+    Thin wrapper over apply_risk_controls, which the compiled simulation loop
+    calls directly with this manager's RiskConfig.
+    """
 
     def __init__(
         self,
@@ -16,6 +64,17 @@ class RiskManager:
         self.enable_size_throttle = enable_size_throttle
         self.min_throttle = min_throttle
 
+    @property
+    def config(self) -> RiskConfig:
+        """Settings as a RiskConfig."""
+        drawdown_limit = math.inf if self.drawdown_limit is None else float(self.drawdown_limit)
+        return RiskConfig(
+            bool(self.enable_kill_switch),
+            drawdown_limit,
+            bool(self.enable_size_throttle),
+            float(self.min_throttle),
+        )
+
     def apply(
         self,
         bid_price: float,
@@ -31,16 +90,7 @@ class RiskManager:
 
         Returns adjusted (bid_price, bid_size, ask_price, ask_size, is_active).
         """
-        is_active = True
-
-        if self.enable_kill_switch and self.drawdown_limit is not None:
-            if cash_pnl <= -abs(self.drawdown_limit):
-                return (bid_price, 0.0, ask_price, 0.0, False)
-
-        if self.enable_size_throttle and max_inventory > 0:
-            inv_ratio = min(1.0, abs(inventory) / max_inventory)
-            scale = max(self.min_throttle, 1.0 - inv_ratio)
-            bid_size *= scale
-            ask_size *= scale
-
-        return (bid_price, bid_size, ask_price, ask_size, is_active)
+        return apply_risk_controls(
+            self.config, bid_price, bid_size, ask_price, ask_size,
+            inventory, max_inventory, cash_pnl,
+        )
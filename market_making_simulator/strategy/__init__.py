@@ -4,6 +4,12 @@ Strategy layer: Market-making decision logic.
 Handles quote generation, position management, and fill execution.
 """
 
-from .market_maker import MarketMaker
+from .market_maker import (
+    MarketMaker, MarketMakerConfig, MarketMakerState,
+    apply_ask_fill, apply_bid_fill, compute_quotes,
+)
 
-__all__ = ["MarketMaker"]
+__all__ = [
+    "MarketMaker", "MarketMakerConfig", "MarketMakerState",
+    "compute_quotes", "apply_bid_fill", "apply_ask_fill",
+]
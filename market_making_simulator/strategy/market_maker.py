@@ -4,20 +4,99 @@ MarketMaker implementation.
 Manages quoting, inventory, and order execution for a market-making strategy.
 """
 
-from typing import Tuple, Optional, TYPE_CHECKING
+import math
+from typing import NamedTuple, Tuple, Optional, TYPE_CHECKING
 from ..risk import RiskManager
 
 if TYPE_CHECKING:
     from ..engine import OrderBook
 
 
+class MarketMakerConfig(NamedTuple):
+    """Quoting parameters of a market maker."""
+    quote_spread: float
+    quote_size: float
+    max_inventory: float
+    inventory_skew_factor: float
+
+
+class MarketMakerState(NamedTuple):
+    """Position and traded value of a market maker."""
+    inventory: float
+    total_buy_value: float
+    total_sell_value: float
+    total_bought: float
+    total_sold: float
+
+
+def compute_quotes(
+    state: MarketMakerState,
+    config: MarketMakerConfig,
+    mid: float
+) -> Tuple[float, float, float, float]:
+    """
+    Generate bid/ask quotes around the mid price.
+    
+    A side is not quoted when a fill would breach the position limit.
+    
+    Returns:
+        Tuple of (bid_price, bid_size, ask_price, ask_size)
+    """
+    # Skew quotes based on inventory
+    # Positive inventory (long) -> widen ask, tighten bid to encourage selling
+    # Negative inventory (short) -> widen bid, tighten ask to encourage buying
+    inventory = state.inventory
+    quote_size = config.quote_size
+    inventory_skew = inventory * config.inventory_skew_factor
+    
+    bid_price = mid - config.quote_spread - inventory_skew
+    ask_price = mid + config.quote_spread + inventory_skew
+    
+    # Size times the limit check (a bool) rather than a branch per side
+    bid_size = quote_size * (math.fabs(inventory + quote_size) <= config.max_inventory)
+    ask_size = quote_size * (math.fabs(inventory - quote_size) <= config.max_inventory)
+    return (bid_price, bid_size, ask_price, ask_size)
+
+
+def apply_bid_fill(state: MarketMakerState, price: float, quantity: float) -> MarketMakerState:
+    """Get the state after our bid is filled (we buy)."""
+    return MarketMakerState(
+        state.inventory + quantity,
+        state.total_buy_value + price * quantity,
+        state.total_sell_value,
+        state.total_bought + quantity,
+        state.total_sold,
+    )
+
+
+def apply_ask_fill(state: MarketMakerState, price: float, quantity: float) -> MarketMakerState:
+    """Get the state after our ask is filled (we sell)."""
+    return MarketMakerState(
+        state.inventory - quantity,
+        state.total_buy_value,
+        state.total_sell_value + price * quantity,
+        state.total_bought,
+        state.total_sold + quantity,
+    )
+
+
 class MarketMaker:
     """
     Market maker that quotes bid/ask around the mid price.
     
     Tracks inventory and adjusts quotes based on inventory risk.
+    
+    The quoting and fill logic lives in the free functions compute_quotes,
+    apply_bid_fill and apply_ask_fill over MarketMakerConfig and
+    MarketMakerState tuples, so the compiled simulation loop can run it
+    without this object; the methods here delegate to them.
     """
     
+    __slots__ = (
+        'quote_spread', 'quote_size', 'max_inventory', 'inventory_skew_factor', 'risk_manager',
+        'inventory', 'total_buy_value', 'total_sell_value', 'total_bought', 'total_sold',
+    )
+    
     def __init__(
         self,
         quote_spread: float = 0.05,
@@ -47,6 +126,26 @@ class MarketMaker:
         self.total_bought = 0.0
         self.total_sold = 0.0
         
+    @property
+    def config(self) -> MarketMakerConfig:
+        """Quoting parameters as a MarketMakerConfig."""
+        return MarketMakerConfig(
+            self.quote_spread, self.quote_size, self.max_inventory, self.inventory_skew_factor
+        )
+    
+    @property
+    def state(self) -> MarketMakerState:
+        """Current position as a MarketMakerState."""
+        return MarketMakerState(
+            self.inventory, self.total_buy_value, self.total_sell_value,
+            self.total_bought, self.total_sold,
+        )
+    
+    @state.setter
+    def state(self, state: MarketMakerState):
+        (self.inventory, self.total_buy_value, self.total_sell_value,
+         self.total_bought, self.total_sold) = state
+    
     def get_inventory(self) -> float:
         """Get current inventory position."""
         return self.inventory
@@ -63,18 +162,9 @@ class MarketMaker:
         Returns:
             Tuple of (bid_price, bid_size, ask_price, ask_size)
         """
-        mid = order_book.get_mid_price()
-        
-        # Skew quotes based on inventory
-        # Positive inventory (long) -> widen ask, tighten bid to encourage selling
-        # Negative inventory (short) -> widen bid, tighten ask to encourage buying
-        inventory_skew = self.inventory * self.inventory_skew_factor
-        
-        bid_price = mid - self.quote_spread - inventory_skew
-        ask_price = mid + self.quote_spread + inventory_skew
-        
-        bid_size = self.quote_size if abs(self.inventory + self.quote_size) <= self.max_inventory else 0.0
-        ask_size = self.quote_size if abs(self.inventory - self.quote_size) <= self.max_inventory else 0.0
+        bid_price, bid_size, ask_price, ask_size = compute_quotes(
+            self.state, self.config, order_book.mid_price
+        )
 
         if self.risk_manager is not None:
             bid_price, bid_size, ask_price, ask_size, _ = self.risk_manager.apply(
@@ -97,9 +187,7 @@ class MarketMaker:
             price: Execution price
             quantity: Execution quantity
         """
-        self.inventory += quantity
-        self.total_buy_value += price * quantity
-        self.total_bought += quantity
+        self.state = apply_bid_fill(self.state, price, quantity)
     
     def execute_ask_fill(self, price: float, quantity: float):
         """
@@ -109,9 +197,7 @@ class MarketMaker:
             price: Execution price
             quantity: Execution quantity
         """
-        self.inventory -= quantity
-        self.total_sell_value += price * quantity
-        self.total_sold += quantity
+        self.state = apply_ask_fill(self.state, price, quantity)
     
     def get_cash_pnl(self) -> float:
         """
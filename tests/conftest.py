@@ -0,0 +1,82 @@
+"""Shared pytest configuration and fixtures for the test suite."""
+
+import os
+import numpy as np
+import pytest
+from market_making_simulator import OrderBook, MarketMaker, PnLTracker, MarketSimulator
+from market_making_simulator.risk import RiskManager
+
+
+def pytest_xdist_auto_num_workers(config):
+    """Size `-n auto` to the core count minus two left free for the system."""
+    workers = (os.cpu_count() or 1) - 2
+    # A single worker is slower than running in-process
+    return workers if workers > 1 else 0
+
+
+# Risk managers are never mutated by the tests, so one per module suffices
+
+@pytest.fixture(scope="module")
+def rm_default():
+    """Risk manager with default settings."""
+    return RiskManager()
+
+
+@pytest.fixture(scope="module")
+def rm_kill_switch():
+    """Risk manager with a kill switch at a drawdown of 50."""
+    return RiskManager(enable_kill_switch=True, drawdown_limit=50.0)
+
+
+@pytest.fixture(scope="module")
+def rm_throttle():
+    """Risk manager with size throttling down to 20%."""
+    return RiskManager(enable_size_throttle=True, min_throttle=0.2)
+
+
+@pytest.fixture(scope="module")
+def rm_combined():
+    """Risk manager with both a kill switch and size throttling."""
+    return RiskManager(
+        enable_kill_switch=True,
+        drawdown_limit=50.0,
+        enable_size_throttle=True,
+        min_throttle=0.3,
+    )
+
+
+@pytest.fixture(scope="module")
+def rng_factory():
+    """Build seeded generators to pass to MarketSimulator(rng=...)."""
+    return lambda seed=42: np.random.default_rng(seed)
+
+
+# Trackers and simulators accumulate state, so each test gets its own
+
+@pytest.fixture
+def tracker():
+    """Empty PnL tracker."""
+    return PnLTracker()
+
+
+@pytest.fixture
+def simulator(rng_factory):
+    """Seeded simulator over a fresh order book, market maker and tracker."""
+    return MarketSimulator(
+        OrderBook(initial_mid=100.0, spread=0.10),
+        MarketMaker(quote_spread=0.05, quote_size=10.0),
+        PnLTracker(),
+        rng=rng_factory(42)
+    )
+
+
+@pytest.fixture(scope="session")
+def seeded_history_10():
+    """History of a 10-step run with seed 123, computed once per session (per worker under xdist)."""
+    simulator = MarketSimulator(
+        OrderBook(initial_mid=100.0),
+        MarketMaker(),
+        PnLTracker(),
+        random_seed=123
+    )
+    return simulator.run(num_steps=10, verbose=False)
@@ -0,0 +1,191 @@
+"""Tests for MarketSimulatorBatch class."""
+
+import unittest
+import numpy as np
+from market_making_simulator import (
+    OrderBook, MarketMaker, PnLTracker, MarketSimulatorBatch
+)
+from market_making_simulator._columns import BUY, NO_TRADE, SELL
+from market_making_simulator.engine import batch
+from market_making_simulator.engine._core import NO_RISK
+from market_making_simulator.risk import RiskManager
+
+
+class TestMarketSimulatorBatch(unittest.TestCase):
+    """Test cases for MarketSimulatorBatch."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.batch = MarketSimulatorBatch(
+            num_envs=64,
+            order_book=OrderBook(initial_mid=100.0),
+            market_maker=MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0),
+            random_seed=42
+        )
+    
+    def test_initialization(self):
+        """Test batch initialization."""
+        self.assertEqual(self.batch.mid.shape, (64,))
+        np.testing.assert_array_equal(self.batch.mid, 100.0)
+        np.testing.assert_array_equal(self.batch.inventory, 0.0)
+        self.assertEqual(self.batch.history['mid_price'].shape, (0, 64))
+    
+    def test_run_shapes(self):
+        """Test that history has one row per step and one column per env."""
+        history = self.batch.run(num_steps=30)
+        self.batch.run(num_steps=20)
+        
+        self.assertEqual(history['mid_price'].shape, (30, 64))
+        self.assertEqual(history['trade_side'].dtype, np.int8)
+        self.assertEqual(self.batch.history['inventory'].shape, (50, 64))
+        self.assertEqual(self.batch.current_time, 50.0)
+    
+    def test_deterministic_with_seed(self):
+        """Test that batches with the same seed produce identical paths."""
+        other = MarketSimulatorBatch(
+            64, OrderBook(initial_mid=100.0),
+            MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0),
+            random_seed=42
+        )
+        np.testing.assert_array_equal(self.batch.run(num_steps=20)['total_pnl'],
+                                      other.run(num_steps=20)['total_pnl'])
+    
+    def test_envs_are_independent(self):
+        """Test that environments draw different paths."""
+        history = self.batch.run(num_steps=20, volatility=0.02)
+        self.assertGreater(np.unique(history['mid_price'][-1]).size, 1)
+    
+    def test_position_limits(self):
+        """Test that inventory never exceeds the position limit."""
+        history = self.batch.run(num_steps=200, arrival_rate=1.0)
+        self.assertLessEqual(np.abs(history['inventory']).max(), 50.0)
+    
+    def test_history_consistent(self):
+        """Test that inventory, trade counts and PnL agree with the fills."""
+        history = self.batch.run(num_steps=100, arrival_rate=0.8)
+        side = history['trade_side']
+        
+        signed_qty = np.where(side == BUY, 1.0, np.where(side == SELL, -1.0, 0.0))
+        expected_inventory = np.cumsum(signed_qty * np.nan_to_num(history['trade_quantity']), axis=0)
+        np.testing.assert_allclose(history['inventory'], expected_inventory)
+        np.testing.assert_array_equal(self.batch.num_buys, (side == BUY).sum(axis=0))
+        
+        summary = self.batch.get_summary()
+        np.testing.assert_allclose(summary['total_pnl'],
+                                   summary['cash_pnl'] + summary['final_inventory'] * summary['final_mid'])
+        np.testing.assert_allclose(history['total_pnl'][-1], summary['total_pnl'])
+    
+    def test_pnl_matches_tracker(self):
+        """Test that per-env PnL components match a PnLTracker fed the same env."""
+        history = self.batch.run(num_steps=100, volatility=0.02, arrival_rate=0.8)
+        env = 3
+        mid_before = np.concatenate(([100.0], history['mid_price'][:-1, env]))
+        traded = history['trade_side'][:, env] != NO_TRADE
+        
+        tracker = PnLTracker()
+        tracker.record_trade_batch(
+            history['time'][traded, env], history['trade_side'][traded, env],
+            history['trade_price'][traded, env], history['trade_quantity'][traded, env],
+            mid_before[traded]
+        )
+        tracker.record_inventory_snapshot_batch(
+            history['time'][:, env], history['inventory'][:, env], history['mid_price'][:, env]
+        )
+        
+        self.assertAlmostEqual(self.batch.spread_capture[env], tracker.get_spread_capture(), places=6)
+        self.assertAlmostEqual(self.batch.inventory_pnl[env], tracker.get_inventory_pnl(), places=6)
+    
+    def test_no_arrivals(self):
+        """Test that no orders means no trades and flat inventory."""
+        history = self.batch.run(num_steps=20, arrival_rate=0.0)
+        self.assertTrue((history['trade_side'] == NO_TRADE).all())
+        np.testing.assert_array_equal(self.batch.inventory, 0.0)
+    
+    def test_float32(self):
+        """Test that a float32 batch keeps its state and history in float32."""
+        batch = MarketSimulatorBatch(
+            64, OrderBook(initial_mid=100.0),
+            MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0),
+            random_seed=42, dtype=np.float32
+        )
+        history = batch.run(num_steps=100, volatility=0.02, arrival_rate=0.8)
+        
+        for name in ('mid', 'inventory', 'total_buy_value', 'total_sell_value', 'spread_capture'):
+            self.assertEqual(getattr(batch, name).dtype, np.float32, name)
+        for name in ('mid_price', 'bid_price', 'inventory', 'trade_price', 'total_pnl'):
+            self.assertEqual(history[name].dtype, np.float32, name)
+        self.assertEqual(history['time'].dtype, np.float64)
+        self.assertLessEqual(np.abs(history['inventory']).max(), 50.0)
+        
+        summary = batch.get_summary()
+        np.testing.assert_allclose(summary['total_pnl'],
+                                   summary['cash_pnl'] + summary['final_inventory'] * summary['final_mid'],
+                                   rtol=1e-4, atol=1e-2)
+    
+    def test_antithetic(self):
+        """Test that antithetic environments receive negated price shocks."""
+        antithetic = MarketSimulatorBatch(
+            64, OrderBook(initial_mid=100.0),
+            MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0),
+            random_seed=42, antithetic=True
+        )
+        history = antithetic.run(num_steps=50, volatility=0.02)
+        log_return = np.diff(np.log(history['mid_price']), axis=0)
+        np.testing.assert_allclose(log_return[:, :32], -log_return[:, 32:], atol=1e-12)
+        self.assertFalse(np.array_equal(history['trade_side'][:, :32], history['trade_side'][:, 32:]))
+        
+        with self.assertRaises(ValueError):
+            MarketSimulatorBatch(5, OrderBook(), MarketMaker(), antithetic=True)
+    
+    def test_compute_quotes_vec_matches_numpy(self):
+        """Test that the compiled quote kernel agrees with the NumPy version."""
+        rng = np.random.default_rng(0)
+        mid = 100.0 + rng.standard_normal(257)
+        inventory = rng.integers(-6, 7, 257) * 10.0
+        cash_pnl = rng.normal(0.0, 50.0, 257)
+        risk = RiskManager(enable_kill_switch=True, drawdown_limit=40.0).config
+        for risk_config in (NO_RISK, risk):
+            args = (mid, inventory, cash_pnl, 0.05, 10.0, 50.0, 0.01, risk_config)
+            for result, expected in zip(batch._compute_quotes_numpy(*args), batch.compute_quotes_vec(*args)):
+                np.testing.assert_allclose(result, expected)
+        
+        args32 = ((mid.astype(np.float32), inventory.astype(np.float32), cash_pnl.astype(np.float32))
+                  + tuple(map(np.float32, args[3:7])) + (risk,))
+        for result in batch.compute_quotes_vec(*args32):
+            self.assertEqual(result.dtype, np.float32)
+    
+    def test_compute_quotes_vec_matches_scalar(self):
+        """Test that the quote kernel applies the same risk controls as a MarketMaker."""
+        risk_manager = RiskManager(enable_kill_switch=True, drawdown_limit=40.0)
+        maker = MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0,
+                            risk_manager=risk_manager)
+        inventory = np.array([-50.0, -30.0, 0.0, 20.0, 40.0, 10.0])
+        cash_pnl = np.array([0.0, 5.0, -10.0, 0.0, -39.0, -40.0])
+        mid = np.full(inventory.size, 100.0)
+        bid, bid_size, ask, ask_size = batch.compute_quotes_vec(
+            mid, inventory, cash_pnl, 0.05, 10.0, 50.0, maker.inventory_skew_factor, risk_manager.config
+        )
+        
+        for i in range(inventory.size):
+            maker.inventory = inventory[i]
+            maker.total_sell_value = cash_pnl[i]
+            expected = maker.get_quotes(OrderBook(initial_mid=100.0))
+            np.testing.assert_allclose((bid[i], bid_size[i], ask[i], ask_size[i]), expected)
+    
+    def test_risk_manager(self):
+        """Test that the throttle shrinks fills and the kill switch stops trading."""
+        maker = MarketMaker(quote_spread=0.05, quote_size=10.0, max_inventory=50.0,
+                            risk_manager=RiskManager(enable_kill_switch=True, drawdown_limit=200.0))
+        risk_batch = MarketSimulatorBatch(64, OrderBook(initial_mid=100.0), maker, random_seed=42)
+        history = risk_batch.run(num_steps=200, volatility=0.05, arrival_rate=1.0)
+        
+        self.assertLess(np.nanmin(history['trade_quantity']), 10.0)
+        killed = history['cash_pnl'] <= -200.0
+        self.assertTrue(killed.any())
+        # Once an env breaches the limit it never trades again
+        after_kill = np.cumsum(killed, axis=0)[:-1] > 0
+        self.assertTrue((history['trade_side'][1:][after_kill] == NO_TRADE).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests for the benchmark scenario grid and on-disk caches."""
+
+import dataclasses
+import numpy as np
+import pytest
+import benchmarks
+from benchmarks import BenchmarkRunner, HistoryCache, ParameterGrid, ScenarioConfig, _cache_key
+
+BASELINE = ScenarioConfig(name="Baseline", quote_spread=0.05, inventory_skew_factor=0.01,
+                          volatility=0.02, arrival_rate=0.5, num_steps=50)
+
+
+@pytest.fixture
+def run_one_calls(monkeypatch):
+    """Record the scenarios actually simulated (rather than served from a cache)."""
+    calls = []
+    run_one = benchmarks._run_one
+
+    def recording_run_one(config_seed, history_cache=None):
+        calls.append(config_seed[0].name)
+        return run_one(config_seed, history_cache)
+
+    monkeypatch.setattr(benchmarks, '_run_one', recording_run_one)
+    return calls
+
+
+def test_parameter_grid():
+    """Test that the grid yields every combination over the base parameters."""
+    grid = ParameterGrid(base={'num_steps': 10}, quote_spread=[0.02, 0.05],
+                         volatility=[0.005, 0.02, 0.05])
+    configs = list(grid.configs())
+
+    assert len(grid) == len(configs) == 6
+    assert [(c.quote_spread, c.volatility) for c in configs] == [
+        (q, v) for q in (0.02, 0.05) for v in (0.005, 0.02, 0.05)
+    ]
+    assert configs[0].name == "quote_spread=0.02, volatility=0.005"
+    assert all(c.num_steps == 10 and c.arrival_rate == ParameterGrid.BASE['arrival_rate']
+               for c in configs)
+
+
+def test_cache_key():
+    """Test that the key ignores the display name but not parameters or seed."""
+    key = _cache_key(BASELINE, 42)
+
+    assert _cache_key(dataclasses.replace(BASELINE, name="Renamed"), 42) == key
+    assert _cache_key(dataclasses.replace(BASELINE, quote_spread=0.10), 42) != key
+    assert _cache_key(BASELINE, 43) != key
+
+
+def test_history_cache_round_trip(tmp_path, simulator):
+    """Test that a stored history and PnL tracker reload unchanged."""
+    history = simulator.run(num_steps=100, arrival_rate=0.8)
+    cache = HistoryCache(str(tmp_path / "histories"))
+    key = _cache_key(BASELINE, 42)
+
+    assert key not in cache
+    assert cache.get(key) is None
+    cache.put(key, history, simulator.pnl_tracker)
+    assert key in cache
+    # Written via a temporary file, which must not be left behind
+    assert [p.name for p in (tmp_path / "histories").iterdir()] == [key + '.npz']
+
+    loaded_history, loaded_tracker = cache.get(key)
+    for name, column in history.arrays().items():
+        np.testing.assert_array_equal(loaded_history.arrays()[name], column, err_msg=name)
+    assert loaded_tracker.get_trade_count() == simulator.pnl_tracker.get_trade_count()
+    assert loaded_tracker.inventory_snapshots == simulator.pnl_tracker.inventory_snapshots
+    expected = simulator.pnl_tracker.get_pnl_decomposition()
+    actual = loaded_tracker.get_pnl_decomposition()
+    np.testing.assert_allclose([actual[k] for k in expected], list(expected.values()), atol=1e-9)
+
+
+def test_run_one_history_cache(tmp_path, monkeypatch):
+    """Test that a cached history gives the same results as simulating again."""
+    history_cache = str(tmp_path / "histories")
+    fresh = benchmarks._run_one((BASELINE, 42), history_cache)
+    # A hit must not simulate
+    monkeypatch.setattr(benchmarks, 'MarketSimulator', None)
+    cached = benchmarks._run_one((BASELINE, 42), history_cache)
+
+    # Reloading re-sums PnL in batch, so allow for rounding
+    assert cached == pytest.approx(fresh, rel=1e-12)
+    assert len(list((tmp_path / "histories").iterdir())) == 1
+
+
+def test_result_cache(tmp_path, run_one_calls):
+    """Test that the shelve cache serves hits, misses on new parameters and follows renames."""
+    cache_path = str(tmp_path / "results")
+    first = BenchmarkRunner(cache_path=cache_path)
+    first.run_all([BASELINE], processes=1)
+    assert run_one_calls == ["Baseline"]
+
+    # Renamed scenario hits the same entry; changed spread misses
+    renamed = dataclasses.replace(BASELINE, name="Renamed")
+    wide = dataclasses.replace(BASELINE, name="Wide", quote_spread=0.10)
+    second = BenchmarkRunner(cache_path=cache_path)
+    second.run_all([renamed, wide], processes=1)
+
+    assert run_one_calls == ["Baseline", "Wide"]
+    hit, miss = second.results
+    assert hit == {**first.results[0], 'scenario': "Renamed"}
+    assert miss['quote_spread'] == 0.10
+
+    # Both are cached now
+    third = BenchmarkRunner(cache_path=cache_path)
+    third.run_all([renamed, wide], processes=1)
+    assert run_one_calls == ["Baseline", "Wide"]
+    assert third.results == second.results
+
+
+@pytest.mark.parametrize("use_cache", [True, False], ids=['cache', 'no_cache'])
+def test_run_all_duplicate_keys(tmp_path, run_one_calls, use_cache):
+    """Test that scenarios sharing a cache key run once and later results stay aligned."""
+    copy = dataclasses.replace(BASELINE, name="Copy")
+    wide = dataclasses.replace(BASELINE, name="Wide", quote_spread=0.10)
+    runner = BenchmarkRunner(cache_path=str(tmp_path / "results") if use_cache else None)
+    runner.run_all([BASELINE, copy, wide], processes=1)
+
+    assert run_one_calls == ["Baseline", "Wide"]
+    baseline, duplicate, wide_result = runner.results
+    assert duplicate == {**baseline, 'scenario': "Copy"}
+    assert wide_result == benchmarks._run_one((wide, 42))
@@ -0,0 +1,111 @@
+"""Tests for History class."""
+
+import math
+import unittest
+import numpy as np
+from market_making_simulator import History
+
+
+class TestHistory(unittest.TestCase):
+    """Test cases for History."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.history = History()
+    
+    def _append_step(self, time, side, inventory):
+        """Append a step with a fill on `side` (-1 for no trade)."""
+        traded = side >= 0
+        self.history.append(
+            time, 100.0 + time, 99.95, 100.05, inventory, side,
+            99.95 if traded else np.nan, 10.0 if traded else np.nan,
+            -10.0 * time, time,
+        )
+    
+    def test_initialization(self):
+        """Test empty history."""
+        self.assertEqual(len(self.history), 0)
+        self.assertEqual(self.history.n, 0)
+        self.assertEqual(self.history.time.size, 0)
+    
+    def test_columns_are_arrays(self):
+        """Test that columns are exposed as NumPy views of recorded steps."""
+        for i in range(300):
+            self._append_step(float(i), -1, 0.0)
+        
+        self.assertIsInstance(self.history.mid_price, np.ndarray)
+        self.assertEqual(self.history.mid_price.size, 300)
+        self.assertEqual(self.history.mid_price[-1], 399.0)
+        self.assertEqual(self.history.trade_side.dtype, np.int8)
+    
+    def test_row_access(self):
+        """Test that indexing returns a step dict."""
+        self._append_step(1.0, 0, 10.0)
+        self._append_step(2.0, -1, 10.0)
+        
+        trade_step = self.history[0]
+        self.assertTrue(trade_step['trade_occurred'])
+        self.assertEqual(trade_step['trade_side'], 'buy')
+        self.assertEqual(trade_step['trade_quantity'], 10.0)
+        
+        quiet_step = self.history[-1]
+        self.assertFalse(quiet_step['trade_occurred'])
+        self.assertIsNone(quiet_step['trade_side'])
+        self.assertIsNone(quiet_step['trade_price'])
+        self.assertTrue(math.isnan(self.history.trade_price[-1]))
+        
+        with self.assertRaises(IndexError):
+            self.history[2]
+
+    def test_slice_access(self):
+        """Test that slicing returns the list of step dicts, like the old list history."""
+        for i in range(5):
+            self._append_step(float(i + 1), i % 2 - 1, 10.0)
+
+        self.assertEqual(self.history[:2], [self.history[0], self.history[1]])
+        self.assertEqual([step['time'] for step in self.history[::-2]], [5.0, 3.0, 1.0])
+        self.assertEqual(self.history[10:], [])
+        self.assertEqual(self.history[np.int64(-1)]['time'], 5.0)
+
+        with self.assertRaises(TypeError):
+            self.history[1.0]
+
+    def test_allocate_and_reserve(self):
+        """Test that preallocated capacity is used without reallocation."""
+        history = History.allocate(1000)
+        self.assertEqual(history.capacity, 1000)
+        self.assertEqual(len(history), 0)
+        
+        history.reserve(1000)
+        self.assertEqual(history.capacity, 1000)
+        history.reserve(1001)
+        self.assertGreaterEqual(history.capacity, 1001)
+
+    def test_zero_capacity_grows(self):
+        """Test that a history created with no capacity can still be appended to."""
+        self.history = History(capacity=0)
+        self._append_step(1.0, 0, 10.0)
+        self._append_step(2.0, -1, 10.0)
+
+        self.assertEqual(len(self.history), 2)
+        self.assertEqual(self.history.time.tolist(), [1.0, 2.0])
+
+    def test_unknown_column(self):
+        """Test that unknown attributes raise AttributeError."""
+        with self.assertRaises(AttributeError):
+            self.history.not_a_column
+    
+    def test_to_frame(self):
+        """Test conversion to a pandas DataFrame."""
+        self._append_step(1.0, 0, 10.0)
+        self._append_step(2.0, -1, 10.0)
+        frame = self.history.to_frame()
+        
+        self.assertEqual(list(frame.columns), list(self.history.columns))
+        self.assertEqual(len(frame), 2)
+        self.assertEqual(frame['inventory'].tolist(), [10.0, 10.0])
+        self.assertEqual(frame['trade_side'].tolist(), [0, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
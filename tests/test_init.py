@@ -0,0 +1,35 @@
+"""
+Data-driven checks of freshly constructed components.
+
+PYTEST_DONT_REWRITE: plain equality asserts, so pytest skips rewriting them.
+"""
+
+from operator import attrgetter
+import pytest
+from market_making_simulator import OrderBook, MarketMaker, PnLTracker, MarketSimulator
+from market_making_simulator.risk import RiskManager
+
+
+@pytest.mark.parametrize("factory,expected", [
+    pytest.param(
+        PnLTracker,
+        {'trades': [], 'inventory_snapshots': []},
+        id='PnLTracker',
+    ),
+    pytest.param(
+        RiskManager,
+        {'enable_kill_switch': False, 'drawdown_limit': None,
+         'enable_size_throttle': True, 'min_throttle': 0.2},
+        id='RiskManager',
+    ),
+    pytest.param(
+        lambda: MarketSimulator(OrderBook(), MarketMaker(), PnLTracker(), random_seed=42),
+        {'current_time': 0.0, 'history.n': 0},
+        id='MarketSimulator',
+    ),
+])
+def test_initialization(factory, expected):
+    """Test that a new component starts from its documented defaults."""
+    obj = factory()
+    # Dotted names reach into sub-objects, e.g. 'history.n'
+    assert {name: attrgetter(name)(obj) for name in expected} == expected
@@ -0,0 +1,47 @@
+"""Tests for the PnL decomposition kernels."""
+
+import unittest
+import numpy as np
+from market_making_simulator import _kernels
+
+
+class TestKernels(unittest.TestCase):
+    """Test cases for the compiled kernels and their NumPy equivalents."""
+    
+    def setUp(self):
+        """Set up a random trade sequence."""
+        rng = np.random.default_rng(7)
+        n = 1000
+        self.side = rng.integers(0, 2, n).astype(np.int8)
+        self.mid = 100.0 + rng.standard_normal(n).cumsum()
+        self.qty = rng.uniform(1.0, 10.0, n)
+    
+    def test_adverse_selection_numpy_matches_kernel(self):
+        """Test that the NumPy fallback agrees with the compiled kernel."""
+        expected = _kernels.adverse_selection(self.side, self.mid, self.qty)
+        result = _kernels._adverse_selection_numpy(self.side, self.mid, self.qty)
+        self.assertAlmostEqual(result, expected, places=6)
+    
+    def test_inventory_pnl_numpy_matches_kernel(self):
+        """Test that the NumPy inventory PnL agrees with the loop version."""
+        inventory = self.qty - 5.0
+        expected = _kernels._inventory_pnl(inventory, self.mid)
+        result = _kernels._inventory_pnl_numpy(inventory, self.mid)
+        self.assertAlmostEqual(result, expected, places=6)
+    
+    def test_spread_capture_numpy_matches_kernel(self):
+        """Test that the NumPy spread capture agrees with the loop version."""
+        spread_vs_mid = self.mid - 100.0
+        expected = _kernels._spread_capture(spread_vs_mid, self.qty)
+        result = _kernels._spread_capture_numpy(spread_vs_mid, self.qty)
+        self.assertAlmostEqual(result, expected, places=6)
+    
+    def test_adverse_selection_short_input(self):
+        """Test that fewer than two trades have no adverse selection."""
+        result = _kernels._adverse_selection_numpy(self.side[:1], self.mid[:1], self.qty[:1])
+        self.assertEqual(result, 0.0)
+        self.assertEqual(_kernels._inventory_pnl_numpy(self.qty[:1], self.mid[:1]), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@
 
 import unittest
 from market_making_simulator import OrderBook, MarketMaker
+from market_making_simulator.strategy import (
+    MarketMakerState, apply_ask_fill, apply_bid_fill, compute_quotes
+)
 
 
 class TestMarketMaker(unittest.TestCase):
@@ -128,6 +131,27 @@ class TestMarketMaker(unittest.TestCase):
         self.assertAlmostEqual(self.market_maker.get_average_buy_price(), 99.95, places=2)
         # Average sell: 100.10
         self.assertAlmostEqual(self.market_maker.get_average_sell_price(), 100.10, places=2)
+    
+    def test_state_functions(self):
+        """Test that the free state functions match the object methods."""
+        self.market_maker.inventory = 30.0
+        state = self.market_maker.state
+        
+        self.assertEqual(
+            compute_quotes(state, self.market_maker.config, 100.0),
+            self.market_maker.get_quotes(self.order_book)
+        )
+        
+        state = apply_ask_fill(apply_bid_fill(state, 99.9, 10.0), 100.1, 5.0)
+        self.market_maker.execute_bid_fill(99.9, 10.0)
+        self.market_maker.execute_ask_fill(100.1, 5.0)
+        self.assertEqual(state, self.market_maker.state)
+        self.assertEqual(state, MarketMakerState(35.0, 999.0, 500.5, 10.0, 5.0))
+        
+        # Assigning a state updates the position
+        self.market_maker.state = MarketMakerState(0.0, 0.0, 0.0, 0.0, 0.0)
+        self.assertEqual(self.market_maker.get_inventory(), 0.0)
+        self.assertEqual(self.market_maker.get_cash_pnl(), 0.0)
 
 
 if __name__ == '__main__':
@@ -1,130 +1,260 @@
 """Tests for PnLTracker class."""
 
-import unittest
+import math
+import numpy as np
+import pytest
+from hypothesis import given, settings, strategies as st
 from market_making_simulator import PnLTracker
+from market_making_simulator.analytics.pnl_tracker import BUY, SELL
 
 
-class TestPnLTracker(unittest.TestCase):
-    """Test cases for PnLTracker."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        self.tracker = PnLTracker()
-    
-    def test_initialization(self):
-        """Test PnL tracker initialization."""
-        self.assertEqual(len(self.tracker.trades), 0)
-        self.assertEqual(len(self.tracker.inventory_snapshots), 0)
-    
-    def test_record_trade(self):
-        """Test trade recording."""
-        self.tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
-        
-        self.assertEqual(len(self.tracker.trades), 1)
-        trade = self.tracker.trades[0]
-        self.assertEqual(trade['side'], 'buy')
-        self.assertEqual(trade['price'], 99.95)
-        self.assertEqual(trade['quantity'], 10.0)
-        self.assertEqual(trade['mid_price'], 100.0)
-        # Buy at 99.95 vs mid 100.0: spread = 0.05
-        self.assertAlmostEqual(trade['spread_vs_mid'], 0.05, places=5)
-    
-    def test_record_inventory_snapshot(self):
-        """Test inventory snapshot recording."""
-        self.tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
-        
-        self.assertEqual(len(self.tracker.inventory_snapshots), 1)
-        self.assertEqual(self.tracker.inventory_snapshots[0], (1.0, 10.0, 100.0))
-    
-    def test_spread_capture(self):
-        """Test spread capture calculation."""
-        # Buy at bid side (99.95) vs mid (100.0): capture 0.05 per unit
-        self.tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
-        # Sell at ask side (100.05) vs mid (100.0): capture 0.05 per unit
-        self.tracker.record_trade(2.0, 'sell', 100.05, 10.0, 100.0)
-        
-        # Total spread capture: (0.05 + 0.05) * 10 = 1.0
-        spread_pnl = self.tracker.get_spread_capture()
-        self.assertAlmostEqual(spread_pnl, 1.0, places=2)
-    
-    def test_inventory_pnl_favorable(self):
-        """Test inventory PnL with favorable price movement."""
-        # Start with inventory of 10 at mid 100
-        self.tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
-        # Price moves up to 101 while holding inventory
-        self.tracker.record_inventory_snapshot(2.0, 10.0, 101.0)
-        
-        # Inventory PnL: 10 * (101 - 100) = 10.0
-        inventory_pnl = self.tracker.get_inventory_pnl()
-        self.assertAlmostEqual(inventory_pnl, 10.0, places=2)
-    
-    def test_inventory_pnl_unfavorable(self):
-        """Test inventory PnL with unfavorable price movement."""
-        # Start with inventory of 10 at mid 100
-        self.tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
-        # Price moves down to 99 while holding inventory
-        self.tracker.record_inventory_snapshot(2.0, 10.0, 99.0)
-        
-        # Inventory PnL: 10 * (99 - 100) = -10.0
-        inventory_pnl = self.tracker.get_inventory_pnl()
-        self.assertAlmostEqual(inventory_pnl, -10.0, places=2)
-    
-    def test_adverse_selection_buy(self):
-        """Test adverse selection when buying before price drop."""
-        # Buy at 100.0
-        self.tracker.record_trade(1.0, 'buy', 100.0, 10.0, 100.0)
-        # Price drops to 99.0 (adverse selection - we bought before drop)
-        self.tracker.record_trade(2.0, 'sell', 99.0, 10.0, 99.0)
-        
-        # Adverse selection cost: 10 * 1.0 = -10.0
-        adverse_selection = self.tracker.get_adverse_selection_cost()
-        self.assertAlmostEqual(adverse_selection, -10.0, places=2)
-    
-    def test_adverse_selection_sell(self):
-        """Test adverse selection when selling before price rise."""
-        # Sell at 100.0
-        self.tracker.record_trade(1.0, 'sell', 100.0, 10.0, 100.0)
-        # Price rises to 101.0 (adverse selection - we sold before rise)
-        self.tracker.record_trade(2.0, 'buy', 101.0, 10.0, 101.0)
-        
-        # Adverse selection cost: 10 * 1.0 = -10.0
-        adverse_selection = self.tracker.get_adverse_selection_cost()
-        self.assertAlmostEqual(adverse_selection, -10.0, places=2)
-    
-    def test_pnl_decomposition(self):
-        """Test complete PnL decomposition."""
-        # Record some trades
-        self.tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
-        self.tracker.record_trade(2.0, 'sell', 100.05, 10.0, 100.0)
-        
-        # Record inventory snapshots
-        self.tracker.record_inventory_snapshot(1.0, 0.0, 100.0)
-        self.tracker.record_inventory_snapshot(2.0, 10.0, 100.0)
-        self.tracker.record_inventory_snapshot(3.0, 0.0, 100.0)
-        
-        decomp = self.tracker.get_pnl_decomposition()
-        
-        self.assertIn('spread_capture', decomp)
-        self.assertIn('inventory_pnl', decomp)
-        self.assertIn('adverse_selection', decomp)
-        self.assertIn('total_pnl', decomp)
-        
-        # Total should equal sum of components
-        total_calculated = (decomp['spread_capture'] + 
-                          decomp['inventory_pnl'] + 
-                          decomp['adverse_selection'])
-        self.assertAlmostEqual(decomp['total_pnl'], total_calculated, places=2)
-    
-    def test_trade_count(self):
-        """Test trade count tracking."""
-        self.tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
-        self.tracker.record_trade(2.0, 'buy', 99.90, 10.0, 100.0)
-        self.tracker.record_trade(3.0, 'sell', 100.05, 10.0, 100.0)
-        
-        num_buys, num_sells = self.tracker.get_trade_count()
-        self.assertEqual(num_buys, 2)
-        self.assertEqual(num_sells, 1)
-
-
-if __name__ == '__main__':
-    unittest.main()
+def test_record_trade(tracker):
+    """Test trade recording."""
+    tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
+
+    assert len(tracker.trades) == 1
+    trade = tracker.trades[0]
+    assert trade['side'] == 'buy'
+    assert trade['price'] == 99.95
+    assert trade['quantity'] == 10.0
+    assert trade['mid_price'] == 100.0
+    # Buy at 99.95 vs mid 100.0: spread = 0.05
+    assert math.isclose(trade['spread_vs_mid'], 0.05, abs_tol=1e-5)
+
+
+def test_record_inventory_snapshot(tracker):
+    """Test inventory snapshot recording."""
+    tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
+
+    assert len(tracker.inventory_snapshots) == 1
+    assert tracker.inventory_snapshots[0] == (1.0, 10.0, 100.0)
+
+
+@pytest.mark.parametrize("new_mid,expected_pnl", [
+    (101.0, 10.0),   # Favorable: 10 * (101 - 100)
+    (99.0, -10.0),   # Unfavorable: 10 * (99 - 100)
+])
+def test_inventory_pnl(tracker, new_mid, expected_pnl):
+    """Test inventory PnL from holding 10 units while the mid moves from 100."""
+    tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
+    tracker.record_inventory_snapshot(2.0, 10.0, new_mid)
+
+    assert math.isclose(tracker.get_inventory_pnl(), expected_pnl, abs_tol=1e-2)
+
+
+# (trades, getter, expected value) for single-metric checks
+PNL_METRIC_CASES = [
+    pytest.param(
+        # Buy 0.05 below mid, sell 0.05 above: (0.05 + 0.05) * 10
+        [(1.0, 'buy', 99.95, 10.0, 100.0), (2.0, 'sell', 100.05, 10.0, 100.0)],
+        'get_spread_capture', 1.0,
+        id='spread_capture',
+    ),
+    pytest.param(
+        # Bought at 100.0, then the price drops to 99.0: 10 * 1.0 lost
+        [(1.0, 'buy', 100.0, 10.0, 100.0), (2.0, 'sell', 99.0, 10.0, 99.0)],
+        'get_adverse_selection_cost', -10.0,
+        id='adverse_selection_buy',
+    ),
+    pytest.param(
+        # Sold at 100.0, then the price rises to 101.0: 10 * 1.0 lost
+        [(1.0, 'sell', 100.0, 10.0, 100.0), (2.0, 'buy', 101.0, 10.0, 101.0)],
+        'get_adverse_selection_cost', -10.0,
+        id='adverse_selection_sell',
+    ),
+]
+
+
+@pytest.mark.parametrize("trades,method,expected", PNL_METRIC_CASES)
+def test_pnl_metric(tracker, trades, method, expected):
+    """Test spread capture and adverse selection for short trade sequences."""
+    for trade in trades:
+        tracker.record_trade(*trade)
+
+    assert math.isclose(getattr(tracker, method)(), expected, abs_tol=1e-2)
+
+
+def test_pnl_decomposition(tracker):
+    """Test complete PnL decomposition."""
+    # Record some trades
+    tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
+    tracker.record_trade(2.0, 'sell', 100.05, 10.0, 100.0)
+
+    # Record inventory snapshots
+    tracker.record_inventory_snapshot(1.0, 0.0, 100.0)
+    tracker.record_inventory_snapshot(2.0, 10.0, 100.0)
+    tracker.record_inventory_snapshot(3.0, 0.0, 100.0)
+
+    decomp = tracker.get_pnl_decomposition()
+
+    assert 'spread_capture' in decomp
+    assert 'inventory_pnl' in decomp
+    assert 'adverse_selection' in decomp
+    assert 'total_pnl' in decomp
+
+    # Total should equal sum of components
+    np.testing.assert_allclose(
+        [decomp['total_pnl']],
+        [decomp['spread_capture'] + decomp['inventory_pnl'] + decomp['adverse_selection']],
+        atol=1e-2,
+    )
+
+
+@settings(max_examples=50, deadline=None)
+@given(trades=st.lists(
+    st.tuples(
+        st.floats(0.1, 1e3),              # timestamp
+        st.sampled_from(['buy', 'sell']),
+        st.floats(50, 150),               # price
+        st.floats(0.1, 100),              # quantity
+        st.floats(50, 150),               # mid price
+    ),
+    min_size=1, max_size=20,
+))
+def test_pnl_decomposition_invariants(trades):
+    """Test spread capture and trade counts against the raw trades, and batch recording."""
+    sequential = PnLTracker()
+    for trade in trades:
+        sequential.record_trade(*trade)
+    decomp = sequential.get_pnl_decomposition()
+
+    # Buys earn mid - price, sells earn price - mid, per unit traded
+    expected_capture = sum(qty * (mid - price) if side == 'buy' else qty * (price - mid)
+                           for _, side, price, qty, mid in trades)
+    assert math.isclose(decomp['spread_capture'], expected_capture, rel_tol=1e-9, abs_tol=1e-6)
+    num_buys = sum(side == 'buy' for _, side, *_ in trades)
+    assert sequential.get_trade_count() == (num_buys, len(trades) - num_buys)
+
+    timestamps, sides, prices, quantities, mids = zip(*trades)
+    batch = PnLTracker()
+    batch.record_trade_batch(timestamps, [SELL if s == 'sell' else BUY for s in sides],
+                             prices, quantities, mids)
+    batch_decomp = batch.get_pnl_decomposition()
+    np.testing.assert_allclose([batch_decomp[key] for key in decomp], list(decomp.values()),
+                               rtol=1e-9, atol=1e-6)
+
+
+def test_trade_count(tracker):
+    """Test trade count tracking."""
+    tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
+    tracker.record_trade(2.0, 'buy', 99.90, 10.0, 100.0)
+    tracker.record_trade(3.0, 'sell', 100.05, 10.0, 100.0)
+
+    num_buys, num_sells = tracker.get_trade_count()
+    assert num_buys == 2
+    assert num_sells == 1
+
+
+def test_record_trade_side_code(tracker):
+    """Test that integer side codes are accepted like side strings."""
+    tracker.record_trade(1.0, BUY, 99.95, 10.0, 100.0)
+    tracker.record_trade(2.0, SELL, 100.05, 10.0, 100.0)
+
+    assert [t['side'] for t in tracker.trades] == ['buy', 'sell']
+    assert math.isclose(tracker.get_spread_capture(), 1.0, abs_tol=1e-5)
+
+
+@pytest.mark.parametrize("side", ['Buy', 'bid', 2, None])
+def test_record_trade_unknown_side(tracker, side):
+    """Test that an unknown side is rejected rather than stored as a code."""
+    with pytest.raises(ValueError, match="Unknown trade side"):
+        tracker.record_trade(1.0, side, 99.95, 10.0, 100.0)
+    assert tracker.get_trade_count() == (0, 0)
+
+
+def test_record_trade_batch(tracker):
+    """Test that batch recording matches trade-by-trade recording."""
+    rng = np.random.default_rng(0)
+    n = 500
+    timestamps = np.arange(n, dtype=float)
+    sides = rng.integers(0, 2, n).astype(np.int8)
+    mids = 100.0 + rng.standard_normal(n).cumsum()
+    prices = mids + np.where(sides == SELL, 0.05, -0.05)
+    quantities = rng.uniform(1.0, 10.0, n)
+
+    sequential = PnLTracker()
+    for args in zip(timestamps, sides.tolist(), prices, quantities, mids):
+        sequential.record_trade(*args)
+    tracker.record_trade_batch(timestamps, sides, prices, quantities, mids)
+
+    assert tracker.get_trade_count() == sequential.get_trade_count()
+    expected = sequential.get_pnl_decomposition()
+    actual = tracker.get_pnl_decomposition()
+    np.testing.assert_allclose([actual[key] for key in expected], list(expected.values()), atol=1e-6)
+
+
+def test_record_trade_batch_side_strings(tracker):
+    """Test that batch recording accepts side strings like record_trade."""
+    tracker.record_trade_batch([1.0, 2.0], ['buy', 'sell'], [99.95, 100.05],
+                               [10.0, 10.0], [100.0, 100.0])
+
+    assert tracker.get_trade_count() == (1, 1)
+    assert math.isclose(tracker.get_spread_capture(), 1.0, abs_tol=1e-5)
+
+
+@pytest.mark.parametrize("sides", [
+    pytest.param([BUY, 2], id='code'),
+    pytest.param([-1, SELL], id='no_trade'),
+    pytest.param(['buy', 'Sell'], id='string'),
+])
+def test_record_trade_batch_unknown_side(tracker, sides):
+    """Test that batch recording rejects unknown sides instead of recording sells."""
+    with pytest.raises(ValueError, match="Unknown trade side"):
+        tracker.record_trade_batch([1.0, 2.0], sides, [99.95, 100.05],
+                                   [10.0, 10.0], [100.0, 100.0])
+    assert tracker.get_trade_count() == (0, 0)
+
+
+def test_record_inventory_snapshot_batch(tracker):
+    """Test that batch snapshots match snapshot-by-snapshot recording."""
+    rng = np.random.default_rng(1)
+    n = 500
+    timestamps = np.arange(n, dtype=float)
+    inventories = rng.integers(-50, 50, n).astype(float)
+    mids = 100.0 + rng.standard_normal(n).cumsum()
+
+    sequential = PnLTracker()
+    for args in zip(timestamps, inventories, mids):
+        sequential.record_inventory_snapshot(*args)
+    # Split in two to check PnL carries over between batches
+    tracker.record_inventory_snapshot_batch(timestamps[:200], inventories[:200], mids[:200])
+    tracker.record_inventory_snapshot_batch(timestamps[200:], inventories[200:], mids[200:])
+
+    assert math.isclose(tracker.get_inventory_pnl(), sequential.get_inventory_pnl(),
+                        abs_tol=1e-6)
+    assert tracker.inventory_snapshots == sequential.inventory_snapshots
+
+
+def test_buffer_growth(tracker):
+    """Test that recording past the initial capacity keeps all rows."""
+    for i in range(1000):
+        tracker.record_trade(float(i), 'buy' if i % 2 else 'sell', 100.0, 1.0, 100.0)
+        tracker.record_inventory_snapshot(float(i), float(i), 100.0 + i)
+
+    assert len(tracker.trades) == 1000
+    assert tracker.get_trade_count() == (500, 500)
+    assert tracker.inventory_snapshots[-1] == (999.0, 999.0, 1099.0)
+    # Inventory PnL: sum of i for i in 0..998 (each step moves mid by 1)
+    assert math.isclose(tracker.get_inventory_pnl(), 998 * 999 / 2, abs_tol=1e-5)
+
+
+def test_cache_invalidated_on_record(tracker):
+    """Test that cached components are recomputed after new data."""
+    tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
+    assert math.isclose(tracker.get_spread_capture(), 0.5, abs_tol=1e-5)
+    assert tracker.get_trade_count() == (1, 0)
+
+    tracker.record_trade(2.0, 'sell', 100.05, 10.0, 100.0)
+    assert math.isclose(tracker.get_spread_capture(), 1.0, abs_tol=1e-5)
+    assert tracker.get_trade_count() == (1, 1)
+
+
+def test_reset(tracker):
+    """Test that reset clears all recorded data."""
+    tracker.record_trade(1.0, 'buy', 99.95, 10.0, 100.0)
+    tracker.record_inventory_snapshot(1.0, 10.0, 100.0)
+    tracker.reset()
+
+    assert len(tracker.trades) == 0
+    assert len(tracker.inventory_snapshots) == 0
+    assert tracker.get_pnl_decomposition()['total_pnl'] == 0.0
@@ -2,203 +2,89 @@
 Tests for the RiskManager module.
 
 Tests kill-switch, size throttling, and combined risk controls.
+
+PYTEST_DONT_REWRITE: plain equality asserts, so pytest skips rewriting them.
 """
 
-import unittest
-from market_making_simulator.risk import RiskManager
-
-
-class TestRiskManager(unittest.TestCase):
-    """Unit tests for RiskManager."""
-
-    def setUp(self):
-        """Set up test fixtures."""
-        self.rm_default = RiskManager()
-        self.rm_kill_switch = RiskManager(enable_kill_switch=True, drawdown_limit=50.0)
-        self.rm_throttle = RiskManager(enable_size_throttle=True, min_throttle=0.2)
-        self.rm_combined = RiskManager(
-            enable_kill_switch=True,
-            drawdown_limit=50.0,
-            enable_size_throttle=True,
-            min_throttle=0.3,
-        )
-
-    def test_initialization(self):
-        """Test RiskManager initialization."""
-        self.assertEqual(self.rm_default.enable_kill_switch, False)
-        self.assertIsNone(self.rm_default.drawdown_limit)
-        self.assertEqual(self.rm_default.enable_size_throttle, True)
-        self.assertEqual(self.rm_default.min_throttle, 0.2)
-
-    def test_no_controls_passes_through(self):
-        """Test that disabled controls pass quotes through unchanged."""
-        rm = RiskManager(enable_kill_switch=False, enable_size_throttle=False)
-        bid_p, bid_s, ask_p, ask_s, is_active = rm.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=0.0,
-            max_inventory=100.0,
-            cash_pnl=0.0,
-        )
-        self.assertEqual(bid_p, 99.0)
-        self.assertEqual(bid_s, 10.0)
-        self.assertEqual(ask_p, 101.0)
-        self.assertEqual(ask_s, 10.0)
-        self.assertTrue(is_active)
-
-    def test_kill_switch_disabled_default(self):
-        """Test that kill-switch is disabled by default."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_default.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=0.0,
-            max_inventory=100.0,
-            cash_pnl=-100.0,
-        )
-        self.assertTrue(is_active)
-
-    def test_kill_switch_triggers_on_drawdown(self):
-        """Test that kill-switch triggers when cash PnL breaches drawdown limit."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_kill_switch.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=0.0,
-            max_inventory=100.0,
-            cash_pnl=-51.0,
-        )
-        self.assertFalse(is_active)
-        self.assertEqual(bid_s, 0.0)
-        self.assertEqual(ask_s, 0.0)
-
-    def test_kill_switch_does_not_trigger_within_limit(self):
-        """Test that kill-switch doesn't trigger when PnL is above limit."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_kill_switch.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=0.0,
-            max_inventory=100.0,
-            cash_pnl=-25.0,
-        )
-        self.assertTrue(is_active)
-
-    def test_size_throttle_zero_inventory(self):
-        """Test size throttling with zero inventory (no scaling)."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_throttle.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=0.0,
-            max_inventory=100.0,
-            cash_pnl=0.0,
-        )
-        # With zero inventory, scaling factor = 1 - (0 / 100) = 1.0
-        self.assertEqual(bid_s, 10.0)
-        self.assertEqual(ask_s, 10.0)
-
-    def test_size_throttle_at_max_inventory(self):
-        """Test size throttling at max inventory."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_throttle.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=100.0,  # At max
-            max_inventory=100.0,
-            cash_pnl=0.0,
-        )
-        # With inventory=max, scaling factor = max(min_throttle, 1 - 1.0) = min_throttle
-        expected_size = 10.0 * 0.2
-        self.assertAlmostEqual(bid_s, expected_size, places=5)
-        self.assertAlmostEqual(ask_s, expected_size, places=5)
-
-    def test_size_throttle_half_max_inventory(self):
-        """Test size throttling at half max inventory."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_throttle.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=50.0,  # Half max
-            max_inventory=100.0,
-            cash_pnl=0.0,
-        )
-        # scaling factor = max(0.2, 1 - 0.5) = 0.5
-        expected_size = 10.0 * 0.5
-        self.assertAlmostEqual(bid_s, expected_size, places=5)
-        self.assertAlmostEqual(ask_s, expected_size, places=5)
-
-    def test_size_throttle_negative_inventory(self):
-        """Test size throttling with negative inventory (short position)."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_throttle.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=-75.0,  # Short 75
-            max_inventory=100.0,
-            cash_pnl=0.0,
-        )
-        # scaling factor = max(0.2, 1 - 0.75) = 0.25
-        expected_size = 10.0 * 0.25
-        self.assertAlmostEqual(bid_s, expected_size, places=5)
-        self.assertAlmostEqual(ask_s, expected_size, places=5)
-
-    def test_combined_kill_switch_and_throttle(self):
-        """Test combined kill-switch and throttling."""
-        # Kill-switch should take precedence
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_combined.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=50.0,
-            max_inventory=100.0,
-            cash_pnl=-51.0,
-        )
-        self.assertFalse(is_active)
-        self.assertEqual(bid_s, 0.0)
-        self.assertEqual(ask_s, 0.0)
-
-    def test_combined_active_with_throttle(self):
-        """Test combined controls when kill-switch is not triggered."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_combined.apply(
-            bid_price=99.0,
-            bid_size=10.0,
-            ask_price=101.0,
-            ask_size=10.0,
-            inventory=50.0,
-            max_inventory=100.0,
-            cash_pnl=-25.0,
-        )
-        self.assertTrue(is_active)
-        # Throttle factor: max(0.3, 1 - 0.5) = 0.5
-        expected_size = 10.0 * 0.5
-        self.assertAlmostEqual(bid_s, expected_size, places=5)
-        self.assertAlmostEqual(ask_s, expected_size, places=5)
-
-    def test_prices_unchanged(self):
-        """Test that prices are never modified by risk controls."""
-        bid_p, bid_s, ask_p, ask_s, is_active = self.rm_combined.apply(
-            bid_price=99.5,
-            bid_size=10.0,
-            ask_price=100.5,
-            ask_size=10.0,
-            inventory=75.0,
-            max_inventory=100.0,
-            cash_pnl=-30.0,
-        )
-        self.assertEqual(bid_p, 99.5)
-        self.assertEqual(ask_p, 100.5)
-
-
-if __name__ == "__main__":
-    unittest.main()
+import math
+import pytest
+from market_making_simulator.risk import RiskConfig, RiskManager, apply_risk_controls
+
+# Quotes and position limit shared by every apply() call
+BASE = dict(bid_price=99.0, bid_size=10.0, ask_price=101.0, ask_size=10.0, max_inventory=100.0)
+
+
+def test_no_controls_passes_through():
+    """Test that disabled controls pass quotes through unchanged."""
+    rm = RiskManager(enable_kill_switch=False, enable_size_throttle=False)
+    bid_p, bid_s, ask_p, ask_s, is_active = rm.apply(**BASE, inventory=0.0, cash_pnl=0.0)
+    assert (bid_p, bid_s, ask_p, ask_s) == (99.0, 10.0, 101.0, 10.0)
+    assert is_active
+
+
+@pytest.mark.parametrize("rm_name,inventory,cash_pnl,expected_active,factor", [
+    # Kill-switch is disabled by default
+    ('rm_default', 0.0, -100.0, True, 1.0),
+    # Kill-switch triggers only when cash PnL breaches the drawdown limit of 50
+    ('rm_kill_switch', 0.0, -51.0, False, 0.0),
+    ('rm_kill_switch', 0.0, -25.0, True, 1.0),
+    # Throttle factor max(min_throttle, 1 - |inventory| / max_inventory)
+    ('rm_throttle', 0.0, 0.0, True, 1.0),      # No inventory, no scaling
+    ('rm_throttle', 100.0, 0.0, True, 0.2),    # At max: min_throttle
+    ('rm_throttle', 50.0, 0.0, True, 0.5),     # Half max: max(0.2, 1 - 0.5)
+    ('rm_throttle', -75.0, 0.0, True, 0.25),   # Short 75: max(0.2, 1 - 0.75)
+    # Combined: kill-switch takes precedence, otherwise max(0.3, 1 - 0.5)
+    ('rm_combined', 50.0, -51.0, False, 0.0),
+    ('rm_combined', 50.0, -25.0, True, 0.5),
+])
+def test_apply(request, rm_name, inventory, cash_pnl, expected_active, factor):
+    """Test kill-switch and size throttle outcomes across risk manager settings."""
+    rm = request.getfixturevalue(rm_name)
+    bid_p, bid_s, ask_p, ask_s, is_active = rm.apply(**BASE, inventory=inventory, cash_pnl=cash_pnl)
+    assert is_active is expected_active
+    assert math.isclose(bid_s, 10.0 * factor, abs_tol=1e-5)
+    assert math.isclose(ask_s, 10.0 * factor, abs_tol=1e-5)
+
+
+def test_prices_unchanged(rm_combined):
+    """Test that prices are never modified by risk controls."""
+    quotes = {**BASE, 'bid_price': 99.5, 'ask_price': 100.5}
+    bid_p, bid_s, ask_p, ask_s, is_active = rm_combined.apply(**quotes, inventory=75.0, cash_pnl=-30.0)
+    assert bid_p == 99.5
+    assert ask_p == 100.5
+
+
+@pytest.mark.parametrize("rm_name,expected", [
+    ('rm_default', RiskConfig(False, math.inf, True, 0.2)),  # No limit stored as infinity
+    ('rm_kill_switch', RiskConfig(True, 50.0, True, 0.2)),
+    ('rm_throttle', RiskConfig(False, math.inf, True, 0.2)),
+    ('rm_combined', RiskConfig(True, 50.0, True, 0.3)),
+])
+def test_config(request, rm_name, expected):
+    """Test the RiskConfig built from each manager's settings."""
+    assert request.getfixturevalue(rm_name).config == expected
+
+
+# (config, inventory, max_inventory, cash_pnl, expected outcome) with quotes
+# 99.0 x 10 / 101.0 x 10
+RISK_CONTROL_CASES = [
+    # Throttle only: 1 - 50 / 100 = 0.5
+    (RiskConfig(False, math.inf, True, 0.2), 50.0, 100.0, -1e9, (99.0, 5.0, 101.0, 5.0, True)),
+    # Throttle floored at min_throttle: max(0.3, 1 - 75 / 100)
+    (RiskConfig(False, math.inf, True, 0.3), -75.0, 100.0, 0.0, (99.0, 3.0, 101.0, 3.0, True)),
+    # No position limit disables the throttle
+    (RiskConfig(False, math.inf, True, 0.2), 50.0, 0.0, 0.0, (99.0, 10.0, 101.0, 10.0, True)),
+    # Kill switch fires at the limit, before any throttling
+    (RiskConfig(True, 50.0, True, 0.2), 50.0, 100.0, -50.0, (99.0, 0.0, 101.0, 0.0, False)),
+    # A negative limit is treated as its magnitude
+    (RiskConfig(True, -50.0, False, 0.2), 0.0, 100.0, -60.0, (99.0, 0.0, 101.0, 0.0, False)),
+    # Kill switch without a limit never fires
+    (RiskConfig(True, math.inf, False, 0.2), 0.0, 100.0, -1e9, (99.0, 10.0, 101.0, 10.0, True)),
+]
+
+
+@pytest.mark.parametrize("config,inventory,max_inventory,cash_pnl,expected", RISK_CONTROL_CASES)
+def test_apply_risk_controls(config, inventory, max_inventory, cash_pnl, expected):
+    """Test apply_risk_controls against hand-computed quotes."""
+    result = apply_risk_controls(config, 99.0, 10.0, 101.0, 10.0, inventory, max_inventory, cash_pnl)
+    assert result == expected
@@ -1,148 +1,342 @@
 """Tests for MarketSimulator class."""
 
-import unittest
+import math
+import numpy as np
+import pytest
 from market_making_simulator import OrderBook, MarketMaker, PnLTracker, MarketSimulator
+from market_making_simulator._columns import BUY, NO_TRADE
+from market_making_simulator.risk import RiskManager
 
+RAN_SIM_STEPS = 20
 
-class TestMarketSimulator(unittest.TestCase):
-    """Test cases for MarketSimulator."""
-    
-    def setUp(self):
-        """Set up test fixtures."""
-        self.order_book = OrderBook(initial_mid=100.0, spread=0.10)
-        self.market_maker = MarketMaker(quote_spread=0.05, quote_size=10.0)
-        self.pnl_tracker = PnLTracker()
-        self.simulator = MarketSimulator(
-            self.order_book,
-            self.market_maker,
-            self.pnl_tracker,
-            random_seed=42
-        )
-    
-    def test_initialization(self):
-        """Test simulator initialization."""
-        self.assertEqual(self.simulator.current_time, 0.0)
-        self.assertEqual(len(self.simulator.history), 0)
-    
-    def test_simulate_price_move(self):
-        """Test price movement simulation."""
-        initial_mid = self.order_book.get_mid_price()
-        self.simulator.simulate_price_move(volatility=0.01, dt=1.0)
-        
-        # Price should have moved (very unlikely to stay exactly the same)
-        # But we can't predict exact value due to randomness
-        new_mid = self.order_book.get_mid_price()
-        self.assertIsInstance(new_mid, float)
-    
-    def test_simulate_order_flow(self):
-        """Test order flow simulation."""
-        # With arrival_rate=1.0, should always get an order
-        order = self.simulator.simulate_order_flow(arrival_rate=1.0)
-        self.assertIn(order, ['buy', 'sell'])
-        
-        # With arrival_rate=0.0, should never get an order
-        order = self.simulator.simulate_order_flow(arrival_rate=0.0)
-        self.assertIsNone(order)
-    
-    def test_step(self):
-        """Test single simulation step."""
-        step_data = self.simulator.step(volatility=0.01, arrival_rate=0.5, dt=1.0)
-        
-        # Check that step returns expected data
-        self.assertIn('time', step_data)
-        self.assertIn('mid_price', step_data)
-        self.assertIn('inventory', step_data)
-        self.assertIn('total_pnl', step_data)
-        
-        # Time should advance
-        self.assertEqual(self.simulator.current_time, 1.0)
-        # History should be recorded
-        self.assertEqual(len(self.simulator.history), 1)
-    
-    def test_run(self):
-        """Test running multiple steps."""
-        num_steps = 10
-        history = self.simulator.run(
-            num_steps=num_steps,
-            volatility=0.01,
-            arrival_rate=0.5,
-            dt=1.0,
-            verbose=False
-        )
-        
-        # Should have recorded all steps
-        self.assertEqual(len(history), num_steps)
-        self.assertEqual(len(self.simulator.history), num_steps)
-        
-        # Time should have advanced
-        self.assertEqual(self.simulator.current_time, float(num_steps))
-    
-    def test_get_summary(self):
-        """Test summary statistics generation."""
-        # Run simulation
-        self.simulator.run(num_steps=20, verbose=False)
-        
-        summary = self.simulator.get_summary()
-        
-        # Check that summary contains expected fields
-        self.assertIn('total_steps', summary)
-        self.assertIn('final_time', summary)
-        self.assertIn('initial_mid', summary)
-        self.assertIn('final_mid', summary)
-        self.assertIn('final_inventory', summary)
-        self.assertIn('num_trades', summary)
-        self.assertIn('total_pnl', summary)
-        self.assertIn('spread_capture', summary)
-        self.assertIn('inventory_pnl', summary)
-        self.assertIn('adverse_selection', summary)
-        
-        # Verify some basic properties
-        self.assertEqual(summary['total_steps'], 20)
-        self.assertEqual(summary['final_time'], 20.0)
-    
-    def test_deterministic_with_seed(self):
-        """Test that simulations are deterministic with same seed."""
-        # First simulation
-        sim1 = MarketSimulator(
-            OrderBook(initial_mid=100.0),
-            MarketMaker(),
-            PnLTracker(),
-            random_seed=123
+
+class DuckMarketMaker:
+    """Minimal strategy implementing only the interface the simulator calls."""
+
+    def __init__(self, half_spread=0.05, size=1.0):
+        self.half_spread = half_spread
+        self.size = size
+        self.position = 0.0
+        self.cash = 0.0
+
+    def get_quotes(self, order_book):
+        mid = order_book.get_mid_price()
+        return mid - self.half_spread, self.size, mid + self.half_spread, self.size
+
+    def execute_bid_fill(self, price, quantity):
+        self.position += quantity
+        self.cash -= price * quantity
+
+    def execute_ask_fill(self, price, quantity):
+        self.position -= quantity
+        self.cash += price * quantity
+
+    def get_inventory(self):
+        return self.position
+
+    def get_cash_pnl(self):
+        return self.cash
+
+    def get_total_pnl(self, current_mid):
+        return self.cash + self.position * current_mid
+
+
+@pytest.fixture
+def duck_simulator(rng_factory):
+    """Simulator driving a duck-typed strategy, so only the Python loop applies."""
+    return MarketSimulator(OrderBook(initial_mid=100.0), DuckMarketMaker(), PnLTracker(),
+                           rng=rng_factory(3))
+
+
+@pytest.fixture(scope="module")
+def ran_sim():
+    """Seeded simulator already run for RAN_SIM_STEPS steps, shared read-only."""
+    simulator = MarketSimulator(
+        OrderBook(initial_mid=100.0, spread=0.10),
+        MarketMaker(quote_spread=0.05, quote_size=10.0),
+        PnLTracker(),
+        random_seed=42
+    )
+    simulator.run(num_steps=RAN_SIM_STEPS, verbose=False)
+    return simulator
+
+
+def test_simulate_price_move(simulator):
+    """Test price movement simulation."""
+    initial_mid = simulator.order_book.get_mid_price()
+    returned_mid = simulator.simulate_price_move(volatility=0.01, dt=1.0)
+
+    # Price should have moved (very unlikely to stay exactly the same)
+    # But we can't predict exact value due to randomness
+    new_mid = simulator.order_book.get_mid_price()
+    assert isinstance(new_mid, float)
+    assert returned_mid == new_mid
+
+
+@pytest.mark.parametrize("arrival_rate,expected_orders", [
+    pytest.param(1.0, {'buy', 'sell'}, id='always'),  # Should always get an order
+    pytest.param(0.0, {None}, id='never'),            # Should never get an order
+])
+def test_simulate_order_flow(simulator, arrival_rate, expected_orders):
+    """Test order flow simulation at the boundary arrival rates."""
+    assert simulator.simulate_order_flow(arrival_rate=arrival_rate) in expected_orders
+
+
+def test_step(simulator):
+    """Test single simulation step."""
+    step_data = simulator.step(volatility=0.01, arrival_rate=0.5, dt=1.0)
+
+    # Check that step returns expected data
+    assert 'time' in step_data
+    assert 'mid_price' in step_data
+    assert 'inventory' in step_data
+    assert 'total_pnl' in step_data
+
+    # Time should advance
+    assert simulator.current_time == 1.0
+    # History should be recorded
+    assert len(simulator.history) == 1
+
+
+def test_run(simulator):
+    """Test running multiple steps."""
+    num_steps = 2
+    history = simulator.run(
+        num_steps=num_steps,
+        volatility=0.01,
+        arrival_rate=0.5,
+        dt=1.0,
+        verbose=False
+    )
+
+    # Should have recorded all steps
+    assert len(history) == num_steps
+    assert len(simulator.history) == num_steps
+
+    # Time should have advanced
+    assert simulator.current_time == float(num_steps)
+
+
+def test_step_duck_typed_strategy(duck_simulator):
+    """Test that step() only relies on the strategy's public methods."""
+    for _ in range(20):
+        step_data = duck_simulator.step(arrival_rate=1.0)
+
+    assert len(duck_simulator.history) == 20
+    assert step_data['inventory'] == duck_simulator.market_maker.get_inventory()
+    assert sum(duck_simulator.pnl_tracker.get_trade_count()) == 20
+
+
+def test_run_duck_typed_strategy(duck_simulator):
+    """Test that run() falls back to the Python loop for a non-MarketMaker strategy."""
+    history = duck_simulator.run(num_steps=50, arrival_rate=1.0)
+
+    assert len(history) == 50
+    assert history.inventory[-1] == duck_simulator.market_maker.get_inventory()
+    assert history.total_pnl[-1] == duck_simulator.market_maker.get_total_pnl(
+        duck_simulator.order_book.get_mid_price())
+
+
+@pytest.mark.slow
+def test_run_long(simulator):
+    """Test a longer run end to end (regression coverage, run with -m slow)."""
+    num_steps = 100
+    history = simulator.run(num_steps=num_steps, volatility=0.01, arrival_rate=0.5)
+
+    assert len(history) == num_steps
+    assert simulator.current_time == float(num_steps)
+    assert history.mid_price[-1] == simulator.order_book.get_mid_price()
+    assert math.isclose(history.total_pnl[-1],
+                        simulator.market_maker.get_total_pnl(simulator.order_book.get_mid_price()),
+                        rel_tol=1e-6)
+    assert simulator.get_summary()['total_steps'] == num_steps
+
+
+def test_run_history_consistent(simulator):
+    """Test that run's history agrees with the fills and PnL tracker."""
+    history = simulator.run(num_steps=200, volatility=0.01, arrival_rate=0.5)
+
+    traded = history.trade_side != NO_TRADE
+    num_buys, num_sells = simulator.pnl_tracker.get_trade_count()
+    assert int(traded.sum()) == num_buys + num_sells
+    assert int((history.trade_side == BUY).sum()) == num_buys
+
+    # Inventory only changes on steps with a fill, by the filled quantity
+    signed_qty = np.where(history.trade_side == BUY, 1.0, -1.0) * history.trade_quantity
+    expected_inventory = np.cumsum(np.where(traded, signed_qty, 0.0))
+    np.testing.assert_allclose(history.inventory, expected_inventory)
+    assert simulator.market_maker.get_inventory() == history.inventory[-1]
+
+
+def _assert_compiled_matches_python(**maker_kwargs):
+    """Check that the compiled run loop matches the per-step Python loop."""
+
+    class PlainMarketMaker(MarketMaker):
+        """Subclass, so run() falls back to the Python loop."""
+
+    def simulate(market_maker):
+        pnl_tracker = PnLTracker()
+        simulator = MarketSimulator(
+            OrderBook(initial_mid=100.0, spread=0.10), market_maker, pnl_tracker,
+            random_seed=7
         )
-        history1 = sim1.run(num_steps=10, verbose=False)
-        
-        # Second simulation with same seed
-        sim2 = MarketSimulator(
+        simulator.run(num_steps=150, volatility=0.02, arrival_rate=0.8)
+        simulator.run(num_steps=50, volatility=0.02, arrival_rate=0.8)
+        return simulator
+
+    compiled = simulate(MarketMaker(**maker_kwargs))
+    python = simulate(PlainMarketMaker(**maker_kwargs))
+
+    for name, column in python.history.arrays().items():
+        np.testing.assert_allclose(compiled.history.arrays()[name], column, err_msg=name)
+    expected = python.pnl_tracker.get_pnl_decomposition()
+    actual = compiled.pnl_tracker.get_pnl_decomposition()
+    np.testing.assert_allclose([actual[key] for key in expected], list(expected.values()), atol=1e-6)
+    assert compiled.pnl_tracker.get_trade_count() == python.pnl_tracker.get_trade_count()
+    assert compiled.market_maker.total_bought == python.market_maker.total_bought
+    np.testing.assert_allclose(
+        [compiled.market_maker.get_cash_pnl(), compiled.order_book.get_mid_price()],
+        [python.market_maker.get_cash_pnl(), python.order_book.get_mid_price()],
+        rtol=1e-6,
+    )
+    assert compiled.current_time == python.current_time
+
+
+def test_compiled_run_matches_python_loop():
+    """Test that the compiled run loop matches the per-step Python loop."""
+    _assert_compiled_matches_python(quote_spread=0.05, quote_size=10.0, max_inventory=30.0)
+
+
+def test_compiled_run_matches_python_loop_with_risk_manager():
+    """Test compiled/Python parity with size throttling and a kill switch."""
+    risk_manager = RiskManager(enable_kill_switch=True, drawdown_limit=300.0, min_throttle=0.3)
+    _assert_compiled_matches_python(
+        quote_spread=0.05, quote_size=10.0, max_inventory=30.0, risk_manager=risk_manager
+    )
+
+
+def test_get_summary(ran_sim):
+    """Test summary statistics generation."""
+    summary = ran_sim.get_summary()
+
+    # Check that summary contains expected fields
+    assert 'total_steps' in summary
+    assert 'final_time' in summary
+    assert 'initial_mid' in summary
+    assert 'final_mid' in summary
+    assert 'final_inventory' in summary
+    assert 'num_trades' in summary
+    assert 'total_pnl' in summary
+    assert 'spread_capture' in summary
+    assert 'inventory_pnl' in summary
+    assert 'adverse_selection' in summary
+
+    # Verify some basic properties
+    assert summary['total_steps'] == RAN_SIM_STEPS
+    assert summary['final_time'] == float(RAN_SIM_STEPS)
+
+
+def test_specialized_run_matches_generic():
+    """Test that a run specialized on its parameters matches the generic run."""
+    def simulate(specialize):
+        risk_manager = RiskManager(enable_kill_switch=True, drawdown_limit=300.0)
+        simulator = MarketSimulator(
             OrderBook(initial_mid=100.0),
-            MarketMaker(),
+            MarketMaker(quote_spread=0.05, quote_size=10.0, risk_manager=risk_manager),
             PnLTracker(),
-            random_seed=123
+            random_seed=11
         )
-        history2 = sim2.run(num_steps=10, verbose=False)
-        
-        # Should produce identical results
-        for i in range(10):
-            self.assertAlmostEqual(
-                history1[i]['mid_price'],
-                history2[i]['mid_price'],
-                places=5
-            )
-            self.assertEqual(
-                history1[i]['inventory'],
-                history2[i]['inventory']
-            )
-    
-    def test_print_summary(self):
-        """Test that print_summary doesn't crash."""
-        # Run simulation
-        self.simulator.run(num_steps=10, verbose=False)
-        
-        # Should not raise exception
-        try:
-            self.simulator.print_summary()
-        except Exception as e:
-            self.fail(f"print_summary raised exception: {e}")
-
-
-if __name__ == '__main__':
-    unittest.main()
+        simulator.run(num_steps=200, volatility=0.02, arrival_rate=0.8, specialize=specialize)
+        return simulator
+
+    generic, specialized = simulate(False), simulate(True)
+    for name, column in generic.history.arrays().items():
+        np.testing.assert_allclose(specialized.history.arrays()[name], column, err_msg=name)
+    assert specialized.get_summary() == generic.get_summary()
+
+
+def test_deterministic_with_seed(seeded_history_10):
+    """Test that simulations are deterministic with same seed."""
+    # Same seed as the cached seeded_history_10 run
+    simulator = MarketSimulator(
+        OrderBook(initial_mid=100.0),
+        MarketMaker(),
+        PnLTracker(),
+        random_seed=123
+    )
+    history = simulator.run(num_steps=10, verbose=False)
+
+    # Should produce identical results
+    for i in range(10):
+        assert math.isclose(history[i]['mid_price'], seeded_history_10[i]['mid_price'],
+                            abs_tol=1e-5)
+        assert history[i]['inventory'] == seeded_history_10[i]['inventory']
+
+
+def test_rng_matches_random_seed(rng_factory):
+    """Test that passing a seeded generator is the same as passing the seed."""
+    from_seed = MarketSimulator(OrderBook(), MarketMaker(), PnLTracker(), random_seed=9)
+    from_rng = MarketSimulator(OrderBook(), MarketMaker(), PnLTracker(), rng=rng_factory(9))
+
+    np.testing.assert_array_equal(from_seed.run(num_steps=20).total_pnl,
+                                  from_rng.run(num_steps=20).total_pnl)
+
+
+def test_simulators_have_independent_generators():
+    """Test that interleaved simulators with the same seed don't interfere."""
+    sims = [
+        MarketSimulator(OrderBook(initial_mid=100.0), MarketMaker(), PnLTracker(), random_seed=5)
+        for _ in range(2)
+    ]
+    for _ in range(10):
+        for sim in sims:
+            sim.step()
+
+    np.testing.assert_array_equal(sims[0].history.mid_price, sims[1].history.mid_price)
+
+
+def test_run_grid():
+    """Test that run_grid runs every combination in grid order."""
+    grid = {'quote_spread': [0.02, 0.05], 'volatility': [0.01, 0.02, 0.05]}
+    calls = []
+    results = MarketSimulator.run_grid(grid, num_steps=50, random_seed=1,
+                                       max_workers=1, progress=lambda *a: calls.append(a))
+
+    assert len(results) == 6
+    assert ([(r['quote_spread'], r['volatility']) for r in results]
+            == [(q, v) for q in grid['quote_spread'] for v in grid['volatility']])
+    assert all(r['total_steps'] == 50 for r in results)
+    assert calls[-1] == (6, 6)
+
+    # Same seed, same result as a hand-built simulator
+    simulator = MarketSimulator(OrderBook(), MarketMaker(quote_spread=0.05), PnLTracker(),
+                                random_seed=1)
+    simulator.run(num_steps=50, volatility=0.02)
+    assert results[4]['total_pnl'] == simulator.get_summary()['total_pnl']
+
+
+@pytest.mark.parametrize("param_grid", [
+    pytest.param({'quote_sprad': [0.02, 0.05]}, id='mapping'),
+    pytest.param([{'quote_spread': 0.02}, {'quote_sprad': 0.05}], id='dicts'),
+])
+def test_run_grid_unknown_parameter(param_grid):
+    """Test that a misspelled grid parameter raises instead of being ignored."""
+    with pytest.raises(ValueError, match="quote_sprad"):
+        MarketSimulator.run_grid(param_grid, num_steps=10, max_workers=1)
+
+
+def test_run_grid_processes():
+    """Test that worker processes give the same results as a serial run."""
+    configs = [{'quote_spread': q, 'random_seed': 3} for q in (0.02, 0.05, 0.10)]
+    serial = MarketSimulator.run_grid(configs, num_steps=30, max_workers=1)
+    parallel = MarketSimulator.run_grid(configs, num_steps=30, max_workers=2)
+    assert serial == parallel
+
+
+def test_print_summary(ran_sim, capsys):
+    """Test that print_summary writes a report (captured and discarded)."""
+    ran_sim.print_summary()
+
+    captured = capsys.readouterr()
+    assert "MARKET-MAKING SIMULATION SUMMARY" in captured.out
+    assert f"Total Steps: {RAN_SIM_STEPS}" in captured.out